@@ -0,0 +1,117 @@
+# Procedural "shader-like" generator mode.
+# Each frame is a full-resolution field (flow-advected, domain-warped fractal
+# noise) computed with vectorized NumPy at a reduced internal resolution and
+# upscaled to the screen. The internal resolution adapts to keep frame time
+# within the TARGET_FPS budget on CPU-only hosts.
+
+import time
+import json
+import os
+import threading
+import pygame
+import numpy as np
+from procedural_fields import ValueNoise, render_field, ResolutionController
+
+# === MQTT CONFIG ===
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+MQTT_TOPIC_SENSOR = "smartart/sensor"
+MQTT_TOPIC_MOTION = "smartart/motion"
+
+# === RENDER CONFIG ===
+TARGET_FPS = int(os.getenv("SMARTART_TARGET_FPS", "30"))  # Frame rate the resolution controller aims for
+START_SCALE = 0.25  # Initial internal resolution as a fraction of the screen
+SMOOTH_UPSCALE = True  # Bilinear upscale (nicer) instead of nearest-neighbour (cheaper)
+SEED = int(os.getenv("SMARTART_SEED", "0"))  # Noise seed
+
+# === SENSOR DATA STATE ===
+# Initialize with some default values
+sensor_data = {
+    "light": 300,
+    "temperature": 22,
+    "humidity": 50,
+    "motion": 0
+}
+
+# === MQTT HANDLER ===
+def on_message(client, userdata, msg):
+    try:
+        data = json.loads(msg.payload.decode()) # Decode the JSON payload
+        if msg.topic == MQTT_TOPIC_SENSOR:
+            sensor_data.update(data) # Update the sensor data with the new values
+        elif msg.topic == MQTT_TOPIC_MOTION:
+            sensor_data["motion"] = int(data["motion"]) # Update motion state
+    except Exception as e: # Handle JSON decoding errors
+        print("MQTT Message Error:", e)
+
+def on_connect(client, userdata, flags, rc):
+    # (Re)subscribe on every connection
+    if rc == 0:
+        client.subscribe([(MQTT_TOPIC_SENSOR, 0), (MQTT_TOPIC_MOTION, 0)])
+
+# === MQTT THREAD ===
+def mqtt_thread():
+    import paho.mqtt.client as mqtt
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.reconnect_delay_set(min_delay=1, max_delay=30)  # Exponential backoff between attempts
+    client.connect_async(MQTT_BROKER, MQTT_PORT)  # Does not block or fail if the broker is not up yet
+    client.loop_forever(retry_first_connection=True)
+
+# === PYGAME SETUP ===
+pygame.display.init()
+info = pygame.display.Info() # Get display informations
+WIDTH, HEIGHT = info.current_w, info.current_h # Use full screen size
+screen = pygame.display.set_mode((WIDTH, HEIGHT)) # Create the Pygame window
+pygame.display.set_caption("Smart Wall Art: Procedural Fields") # Set the window title
+clock = pygame.time.Clock() # Create a clock to control the frame rate
+
+# Canvas units: 4 units across, height keeps the screen aspect ratio
+REGION = (0.0, 0.0, 4.0, 4.0 * HEIGHT / WIDTH)
+
+# === FRAME RENDERING ===
+def draw_frame(noise, controller, t):
+    # Render the field at the internal resolution and upscale it to the screen
+    w, h = controller.internal_size(WIDTH, HEIGHT)
+    rgb = render_field(noise, w, h, t, sensor_data, REGION)
+    small = pygame.surfarray.make_surface(np.ascontiguousarray(rgb.swapaxes(0, 1)))  # surfarray is (x, y)
+    if SMOOTH_UPSCALE:
+        pygame.transform.smoothscale(small, (WIDTH, HEIGHT), screen)
+    else:
+        pygame.transform.scale(small, (WIDTH, HEIGHT), screen)
+    pygame.display.flip()
+    return w, h
+
+# === MAIN LOOP ===
+def main():
+    threading.Thread(target=mqtt_thread, daemon=True).start() # Start MQTT thread
+    noise = ValueNoise(SEED)
+    controller = ResolutionController(TARGET_FPS, scale=START_SCALE)
+    start_time = time.time()
+    last_caption = 0.0
+    running = True
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False # Exit the loop
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+
+        frame_start = time.perf_counter()
+        w, h = draw_frame(noise, controller, time.time() - start_time)
+        controller.update(time.perf_counter() - frame_start)
+
+        now = time.time()
+        if now - last_caption > 1.0: # Show the achieved frame rate and internal resolution
+            last_caption = now
+            pygame.display.set_caption(
+                f"Smart Wall Art: Procedural Fields ({clock.get_fps():.0f} fps, {w}x{h} internal)")
+
+        clock.tick(TARGET_FPS) # Control the frame rate
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Vectorized procedural fields for the "shader-like" generator mode.
+# Everything is computed on whole NumPy arrays (one value per pixel of the
+# internal resolution): fractal value noise, domain warping and a flow field
+# that advects the sampling coordinates. No per-primitive draw calls, so cost
+# depends only on the internal resolution, not on scene complexity.
+# Coordinates are in "canvas units" so a sub-rectangle of a larger canvas
+# (e.g. one panel of a video wall) renders exactly the pixels of the full image.
+
+import numpy as np
+
+
+class ValueNoise:
+    # Lattice value noise with a seeded permutation table, smoothstep interpolated
+    def __init__(self, seed=0):
+        rng = np.random.default_rng(seed)
+        perm = np.concatenate([rng.permutation(256)] * 2)
+        values = rng.random(256).astype(np.float32)
+        # Precompute the hashed lattice value of every (ix, iy) cell: one gather per corner
+        ix, iy = np.meshgrid(np.arange(256), np.arange(256), indexing="ij")
+        self.table = values[perm[perm[ix] + iy]].ravel()
+
+    def _lattice(self, ix, iy):
+        return self.table[((ix & 255) << 8) | (iy & 255)]
+
+    def sample(self, x, y):
+        # Noise in [0, 1] at float coordinates (arrays of any shape)
+        x0 = np.floor(x)
+        y0 = np.floor(y)
+        fx = x - x0
+        fy = y - y0
+        ix = x0.astype(np.int32)
+        iy = y0.astype(np.int32)
+        sx = fx * fx * (3 - 2 * fx)  # Smoothstep
+        sy = fy * fy * (3 - 2 * fy)
+        v00 = self._lattice(ix, iy)
+        v10 = self._lattice(ix + 1, iy)
+        v01 = self._lattice(ix, iy + 1)
+        v11 = self._lattice(ix + 1, iy + 1)
+        top = v00 + sx * (v10 - v00)
+        bottom = v01 + sx * (v11 - v01)
+        return top + sy * (bottom - top)
+
+    def fbm(self, x, y, octaves=4, lacunarity=2.0, gain=0.5):
+        # Fractal Brownian motion: summed octaves of noise, normalized to [0, 1]
+        total = np.zeros_like(x, dtype=np.float32)
+        amplitude, frequency, norm = 1.0, 1.0, 0.0
+        for i in range(octaves):
+            # Offset each octave so lattice artifacts do not line up
+            total += amplitude * self.sample(x * frequency + 17.0 * i, y * frequency + 31.0 * i)
+            norm += amplitude
+            amplitude *= gain
+            frequency *= lacunarity
+        return total / norm
+
+
+# === Sensor Mapping ===
+def sensor_params(sensor):
+    # Translate the sensor vector into field parameters
+    light = float(np.clip(sensor.get("light", 300) / 1000.0, 0, 1))
+    temp = float(np.clip((sensor.get("temperature", 22) - 10) / 30.0, 0, 1))
+    humidity = float(np.clip(sensor.get("humidity", 50) / 100.0, 0, 1))
+    motion = 1.0 if sensor.get("motion", 0) == 1 else 0.0
+    return {
+        "light": light,
+        "temp": temp,
+        "warp": 1.0 + 3.0 * humidity,  # Humid rooms melt into heavy domain warping
+        "octaves": 2 + int(round(2 * (1 - humidity))),  # Dry rooms get crisper detail
+        "flow_steps": 1 + int(2 * motion),  # Motion stretches the flow streaks
+        "speed": 0.05 + 0.25 * motion,  # Animation speed
+    }
+
+
+def palette(params):
+    # Three color stops: background (light), base (temperature, like temp_to_color), accent
+    t = params["temp"]
+    v = 40 + 180 * params["light"]
+    base = np.array([(1 - t) * 50 + t * 255, (1 - t) * 150 + t * 50, (1 - t) * 255 + t * 50])
+    background = np.array([v, v, v]) * 0.35
+    accent = 255 - 0.6 * base
+    return np.stack([background, base, accent]).astype(np.float32)
+
+
+# === Field Rendering ===
+_grid_cache = {}
+
+def _grid(width, height, region):
+    # Cached pixel-center coordinates (canvas units) for a region (x0, y0, x1, y1)
+    key = (width, height, region)
+    grid = _grid_cache.get(key)
+    if grid is None:
+        x0, y0, x1, y1 = region
+        xs = np.linspace(x0, x1, width, endpoint=False, dtype=np.float32) + (x1 - x0) / (2 * width)
+        ys = np.linspace(y0, y1, height, endpoint=False, dtype=np.float32) + (y1 - y0) / (2 * height)
+        grid = np.meshgrid(xs, ys)
+        if len(_grid_cache) > 16:
+            _grid_cache.clear()
+        _grid_cache[key] = grid
+    return grid
+
+
+def render_field(noise, width, height, t, sensor, region=(0.0, 0.0, 4.0, 2.25)):
+    # Render one frame as a (height, width, 3) uint8 array
+    params = sensor_params(sensor)
+    x, y = _grid(width, height, region)
+    octaves = params["octaves"]
+    phase = t * params["speed"]
+
+    # Flow field: advect sampling coordinates through a noise-driven angle field
+    fx, fy = x, y
+    for _ in range(params["flow_steps"]):
+        angle = noise.sample(fx * 0.5 + phase, fy * 0.5) * np.float32(4 * np.pi)
+        fx = fx + np.float32(0.15) * np.cos(angle)
+        fy = fy + np.float32(0.15) * np.sin(angle)
+
+    # Domain warping: f(p + w * fbm(p + w * fbm(p)))
+    warp = params["warp"]
+    qx = noise.fbm(fx + phase, fy, octaves)
+    qy = noise.fbm(fx + 5.2, fy + 1.3 - phase, octaves)
+    rx = noise.fbm(fx + warp * qx + 1.7, fy + warp * qy + 9.2, octaves)
+    ry = noise.fbm(fx + warp * qx + 8.3, fy + warp * qy + 2.8, octaves)
+    f = noise.fbm(fx + warp * rx, fy + warp * ry, octaves)
+
+    # Contrast stretch (fbm clusters around 0.5) and palette lookup
+    f = np.clip((f - 0.5) * (1.6 + params["light"]) + 0.5, 0, 1)
+    stops = palette(params)
+    lo = np.clip(f * 2, 0, 1)[..., None]
+    hi = np.clip(f * 2 - 1, 0, 1)[..., None]
+    rgb = stops[0] + lo * (stops[1] - stops[0]) + hi * (stops[2] - stops[1])
+    # Shade by the warp magnitude for depth
+    rgb *= (0.7 + 0.3 * np.clip(rx, 0, 1))[..., None]
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+# === Adaptive Resolution ===
+class ResolutionController:
+    # Adjusts the internal render scale to keep frame time within the target budget
+    def __init__(self, target_fps=30, scale=0.25, min_scale=0.08, max_scale=1.0, smoothing=0.2):
+        self.budget = 1.0 / target_fps
+        self.scale = scale
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.smoothing = smoothing
+        self.frame_time = None  # Exponential moving average
+
+    def update(self, frame_time):
+        # Feed the last frame's cost; returns the scale for the next frame
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += self.smoothing * (frame_time - self.frame_time)
+        if self.frame_time > 1.05 * self.budget:
+            # Cost grows with pixel count (scale^2), so shrink by the square root of the overshoot
+            self.scale *= max(0.7, (self.budget / self.frame_time) ** 0.5)
+        elif self.frame_time < 0.7 * self.budget:
+            self.scale *= 1.03
+        self.scale = min(self.max_scale, max(self.min_scale, self.scale))
+        return self.scale
+
+    def internal_size(self, width, height):
+        # Internal resolution for the current scale, rounded to multiples of 4
+        w = max(16, int(width * self.scale) // 4 * 4)
+        h = max(16, int(height * self.scale) // 4 * 4)
+        return w, h
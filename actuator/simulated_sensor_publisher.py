@@ -1,24 +1,40 @@
+# Simulated sensor publisher and load generator.
+# With no arguments it behaves like a single fake device (one reading, one motion
+# event and one rating every 5 seconds). Options scale this up to N devices with
+# configurable rates and signal models, replay recorded MQTT traffic at Nx speed,
+# and report throughput plus end-to-end latency (publish -> visible in InfluxDB).
 
 # Import required libraries
-import time  # For sleep/delay
+import os  # For locating the shared storage package
+import sys  # For importing the shared storage package
+import time  # For sleep/delay and timing
 import json  # For encoding data as JSON
+import math  # For the diurnal signal model
 import random  # For generating random sensor values
+import argparse  # For command line options
+import threading  # For running simulated devices and pollers in parallel
 import paho.mqtt.client as mqtt  # For MQTT communication
 import requests  # For sending HTTP requests to visual rating API
 
 
 # MQTT configuration
 MQTT_BROKER = "localhost"  # MQTT broker host
+MQTT_PORT = 1883  # MQTT broker port
 MQTT_TOPIC_SENSOR = "smartart/sensor"  # Topic for sensor data
 MQTT_TOPIC_MOTION = "smartart/motion"  # Topic for motion data
 
+# Visual rating API configuration
+VISUAL_API_URL = "http://localhost:5050/rate_visual"  # Endpoint for rating API
 
-# Create and connect MQTT client
-client = mqtt.Client()
-client.connect(MQTT_BROKER)
-client.loop_start()  # Start MQTT loop in background
+# Simulated user ID for ratings (devices get consecutive IDs from here)
+SIM_USER_ID = 9999
 
+# Latency probe: how often storage is polled and how many pending probe_ids one query may filter on
+PROBE_POLL_INTERVAL = 0.1  # Seconds; also the resolution of the measured latency
+PROBE_QUERY_MAX = 500
 
+
+# === Signal Models ===
 # Generate random sensor data
 def generate_fake_sensor_data():
     return {
@@ -28,6 +44,27 @@ def generate_fake_sensor_data():
     }
 
 
+class RealisticSignal:
+    # Diurnal cycle + slow random walk + sensor noise, clamped to the sensors' ranges
+    def __init__(self, rng):
+        self.rng = rng
+        self.phase = rng.uniform(0, 2 * math.pi)  # Devices are not perfectly in sync
+        self.drift = {"light": 0.0, "temperature": 0.0, "humidity": 0.0}
+
+    def sample(self, t):
+        day = 2 * math.pi * t / 86400.0 + self.phase
+        for k, step in (("light", 5.0), ("temperature", 0.05), ("humidity", 0.2)):
+            self.drift[k] += self.rng.gauss(0, step)
+        light = 400 + 300 * math.sin(day) + self.drift["light"] + self.rng.gauss(0, 15)
+        temperature = 22 + 3 * math.sin(day - 1.0) + self.drift["temperature"] + self.rng.gauss(0, 0.2)
+        humidity = 50 - 8 * math.sin(day - 1.0) + self.drift["humidity"] + self.rng.gauss(0, 1.0)
+        return {
+            "light": int(max(0, min(1023, light))),
+            "temperature": round(max(-10, min(50, temperature)), 1),
+            "humidity": round(max(0, min(100, humidity)), 1),
+        }
+
+
 # Generate random motion data
 def generate_fake_motion():
     return {
@@ -35,46 +72,280 @@ def generate_fake_motion():
     }
 
 
-# Visual rating API configuration
-VISUAL_API_URL = "http://localhost:5050/rate_visual"  # Endpoint for rating API
+# === Stats ===
+class Stats:
+    # Thread-safe counters and latency samples
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.latencies = {}
 
-# Simulated user ID for ratings
-SIM_USER_ID = 9999
+    def count(self, name, n=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def latency(self, name, seconds):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(seconds)
+
+    def summary(self, elapsed):
+        with self.lock:
+            out = {"elapsed_s": round(elapsed, 2), "counts": dict(self.counts), "rates_per_s": {}, "latency_ms": {}}
+            for name, n in self.counts.items():
+                out["rates_per_s"][name] = round(n / elapsed, 2) if elapsed > 0 else 0.0
+            for name, values in self.latencies.items():
+                values = sorted(values)
+                pct = lambda p: round(1000 * values[min(len(values) - 1, int(p * len(values)))], 1)
+                out["latency_ms"][name] = {
+                    "n": len(values), "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                    "max": round(1000 * values[-1], 1)
+                }
+            return out
+
+
+# === Rating Traffic ===
+def post_rating(session, stats, user_id, verbose):
+    # Simulate a visual rating and time the API round trip
+    visual_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())  # Use current time as visual_time (ISO format)
+    payload = {
+        "user_id": user_id,
+        "rating": random.randint(0, 5),  # Random rating 0-5
+        "visual_time": visual_time
+    }
+    start = time.perf_counter()
+    try:
+        resp = session.post(VISUAL_API_URL, json=payload, timeout=2)
+        stats.latency("rating_http", time.perf_counter() - start)
+        if resp.status_code == 200:
+            stats.count("ratings_ok")
+            if verbose:
+                print(f"Published simulated rating: {payload}")
+        else:
+            stats.count("ratings_failed")
+            print(f"Failed to publish rating: {resp.text}")
+    except Exception as e:
+        stats.count("ratings_failed")
+        print(f"Error sending rating: {e}")
+
+
+# === Latency Probes ===
+class LatencyProbe:
+    # Tags some sensor messages with a probe_id and polls storage until each one is visible
+    def __init__(self, stats, timeout=10.0):
+        # Storage backend and location come from SMARTART_STORAGE / INFLUX_* (see storage/__init__.py)
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Repository root
+        from storage import open_storage, now_ns  # Imported lazily, only needed for latency measurements
+        self.storage = open_storage()
+        self.now_ns = now_ns
+        self.started_ns = now_ns()
+        self.stats = stats
+        self.timeout = timeout
+        self.pending = {}  # probe_id -> publish time
+        self.lock = threading.Lock()
+        self.next_id = int(time.time() * 1000)  # Unique across runs
+        self.stop = threading.Event()
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    def tag(self, payload):
+        with self.lock:
+            self.next_id += 1
+            payload["probe_id"] = self.next_id
+            self.pending[self.next_id] = time.perf_counter()
+        return payload
+
+    def _poll(self):
+        while not self.stop.is_set():
+            with self.lock:
+                ids = sorted(self.pending)[:PROBE_QUERY_MAX]  # Oldest first, bounded filter size
+                oldest = min((self.pending[i] for i in ids), default=None)
+            if ids:
+                try:
+                    # Only the pending probes, only since the oldest of them was sent (at most timeout + 1 s back)
+                    window = min(time.perf_counter() - oldest, self.timeout) + 1.0
+                    start = self.now_ns() - int(window * 1_000_000_000)
+                    points = self.storage.query("all_sensor_data", fields=["probe_id"],
+                                                start=max(start, self.started_ns), where={"probe_id": ids})
+                    seen = {int(p["probe_id"]) for p in points if p.get("probe_id") is not None}
+                except Exception as e:
+                    print(f"Latency probe query failed: {e}")
+                    seen = set()
+                now = time.perf_counter()
+                with self.lock:
+                    for i in ids:
+                        sent = self.pending.get(i)
+                        if i in seen:
+                            self.stats.latency("publish_to_influx", now - sent)
+                            del self.pending[i]
+                        elif now - sent > self.timeout:
+                            self.stats.count("probes_lost")
+                            del self.pending[i]
+            self.stop.wait(PROBE_POLL_INTERVAL)
 
-# Main loop: publish sensor, motion, and simulated ratings
-try:
-    while True:
-        sensor_data = generate_fake_sensor_data()  # Generate sensor values
-        motion_data = generate_fake_motion()  # Generate motion value
-
-        client.publish(MQTT_TOPIC_SENSOR, json.dumps(sensor_data))  # Publish sensor data
-        client.publish(MQTT_TOPIC_MOTION, json.dumps(motion_data))  # Publish motion data
-
-        print("Published sensor:", sensor_data)  # Log sensor data
-        print("Published motion:", motion_data)  # Log motion data
-
-        # Simulate visual rating after each motion event
-        if motion_data["motion"] == 1:
-            # Use current time as visual_time (ISO format)
-            visual_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-            rating = random.randint(0, 5)  # Random rating 0-5
-            payload = {
-                "user_id": SIM_USER_ID,
-                "rating": rating,
-                "visual_time": visual_time
-            }
-            try:
-                resp = requests.post(VISUAL_API_URL, json=payload, timeout=2)
-                if resp.status_code == 200:
-                    print(f"Published simulated rating: {payload}")
-                else:
-                    print(f"Failed to publish rating: {resp.text}")
-            except Exception as e:
-                print(f"Error sending rating: {e}")
-
-        time.sleep(5)  # Wait 5 seconds before next publish (adjust as needed)
-
-except KeyboardInterrupt:
+
+# === Simulated Device ===
+def make_client(client_id):
+    # Create and connect an MQTT client with its own network loop
+    client = mqtt.Client(client_id=client_id)
+    client.connect(MQTT_BROKER, MQTT_PORT)
+    client.loop_start()  # Start MQTT loop in background
+    return client
+
+
+def run_device(index, args, stats, probe, stop):
+    # Publish sensor readings (and motion + ratings) for one simulated device
+    rng = random.Random(args.seed + index)
+    signal = RealisticSignal(rng) if args.signal == "realistic" else None
+    client = make_client(f"smartart-sim-{index}-{rng.randint(0, 1 << 30)}")
+    session = requests.Session()  # Reuse the HTTP connection for ratings
+    interval = 1.0 / args.rate
+    start = time.time()
+    next_tick = time.perf_counter() + rng.uniform(0, interval)  # Spread devices over the first interval
+    n = 0
+    try:
+        while not stop.is_set():
+            sensor_data = signal.sample(time.time() - start) if signal else generate_fake_sensor_data()
+            if probe is not None and n % args.probe_every == 0:
+                probe.tag(sensor_data)
+            client.publish(MQTT_TOPIC_SENSOR, json.dumps(sensor_data))  # Publish sensor data
+            stats.count("sensor_published")
+            if args.verbose:
+                print(f"[device {index}] Published sensor:", sensor_data)  # Log sensor data
+
+            if rng.random() < args.motion_prob:
+                motion_data = generate_fake_motion()  # Generate motion value
+                client.publish(MQTT_TOPIC_MOTION, json.dumps(motion_data))  # Publish motion data
+                stats.count("motion_published")
+                # Simulate visual rating after each motion event
+                if args.ratings and rng.random() < args.rating_prob:
+                    post_rating(session, stats, SIM_USER_ID + index, args.verbose)
+            n += 1
+
+            # Fixed-rate schedule, without drifting when publishing is slow
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                stats.count("schedule_overruns")
+                next_tick = time.perf_counter()
+    finally:
+        client.loop_stop()  # Stop MQTT loop
+        client.disconnect()  # Disconnect MQTT client
+
+
+# === Record / Replay ===
+def record(path, stop):
+    # Subscribe to the sensor topics and append every message to a JSONL file
+    start = time.time()
+    with open(path, "a") as f:
+        def on_message(client, userdata, msg):
+            line = {"t": round(time.time() - start, 4), "topic": msg.topic, "payload": msg.payload.decode()}
+            f.write(json.dumps(line) + "\n")
+        client = mqtt.Client()
+        client.on_message = on_message
+        client.connect(MQTT_BROKER, MQTT_PORT)
+        client.subscribe([(MQTT_TOPIC_SENSOR, 0), (MQTT_TOPIC_MOTION, 0)])
+        client.loop_start()
+        print(f"Recording MQTT traffic to {path} (Ctrl+C to stop)...")
+        stop.wait()
+        client.loop_stop()
+        client.disconnect()
+
+
+def replay(path, speed, loops, stats, stop):
+    # Republish a recorded JSONL file, compressing its timeline by `speed`
+    with open(path) as f:
+        messages = [json.loads(line) for line in f if line.strip()]
+    if not messages:
+        print(f"No messages in {path}")
+        return
+    client = make_client(f"smartart-replay-{random.randint(0, 1 << 30)}")
+    try:
+        for _ in range(loops):
+            start = time.perf_counter()
+            for m in messages:
+                delay = m["t"] / speed - (time.perf_counter() - start)
+                if delay > 0 and stop.wait(delay):
+                    return
+                if stop.is_set():
+                    return
+                client.publish(m["topic"], m["payload"])
+                stats.count("replayed")
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description="SmartArt sensor simulator and load generator")
+    parser.add_argument("--devices", type=int, default=1, help="Number of simulated devices")
+    parser.add_argument("--rate", type=float, default=0.2, help="Sensor messages per second per device")
+    parser.add_argument("--signal", choices=["random", "realistic"], default="random", help="Sensor signal model")
+    parser.add_argument("--motion-prob", type=float, default=1.0, help="Chance of a motion event per reading")
+    parser.add_argument("--no-ratings", dest="ratings", action="store_false", help="Do not send rating traffic")
+    parser.add_argument("--rating-prob", type=float, default=1.0, help="Chance of a rating per motion event")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--probe-every", type=int, default=0,
+                        help="Tag every Nth sensor message per device to measure publish -> InfluxDB latency (0 = off)")
+    parser.add_argument("--record", metavar="FILE", help="Record live MQTT traffic to a JSONL file instead")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recorded JSONL file instead of simulating")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--loops", type=int, default=1, help="Number of times to replay the file")
+    parser.add_argument("--report", metavar="FILE", help="Write the final stats as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Log every published message")
+    args = parser.parse_args()
+    # A single default device keeps the original chatty output
+    args.verbose = args.verbose or (args.devices == 1 and not args.replay)
+
+    stop = threading.Event()
+    stats = Stats()
+
+    if args.record:
+        try:
+            record(args.record, stop)
+        except KeyboardInterrupt:
+            stop.set()
+            print("Recording stopped.")
+        return
+
+    probe = LatencyProbe(stats) if args.probe_every > 0 else None
+    if args.replay:
+        workers = [threading.Thread(target=replay, args=(args.replay, args.speed, args.loops, stats, stop))]
+    else:
+        workers = [threading.Thread(target=run_device, args=(i, args, stats, probe, stop))
+                   for i in range(args.devices)]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.daemon = True
+        w.start()
+    try:
+        last = start
+        while any(w.is_alive() for w in workers):
+            if args.duration and time.perf_counter() - start >= args.duration:
+                break
+            time.sleep(0.5)
+            if not args.verbose and time.perf_counter() - last >= 5:
+                last = time.perf_counter()
+                print(json.dumps(stats.summary(last - start)["rates_per_s"]))  # Periodic throughput line
+    except KeyboardInterrupt:
+        pass
     print("Simulation stopped.")  # Log when simulation is stopped
-    client.loop_stop()  # Stop MQTT loop
-    client.disconnect()  # Disconnect MQTT client
+    stop.set()
+    for w in workers:
+        w.join(timeout=5)
+    if probe is not None:
+        time.sleep(min(probe.timeout, 2.0))  # Give the last probes a chance to land
+        probe.stop.set()
+
+    summary = stats.summary(time.perf_counter() - start)
+    print(json.dumps(summary, indent=2))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Startup-time benchmark for static_art_generator.py.
+# Launches the renderer several times (headless by default), reads the
+# "[startup] <event> <seconds>" lines it prints and reports, per event, the
+# wall-clock time since the process was spawned: first_frame, model_ready,
+# mqtt_connected. The renderer is asked to exit once the model has loaded.
+
+# Import required libraries
+import os  # For environment and paths
+import sys  # For the current interpreter
+import json  # For the JSON report
+import time  # For wall-clock timing
+import argparse  # For command line options
+import statistics  # For medians
+import subprocess  # For launching the renderer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "static_art_generator.py")
+FIRST_FRAME_BUDGET = 1.0  # Seconds; art should be on the wall within a second of power-on
+
+
+def run_once(timeout, headless):
+    # Spawn the renderer and collect its startup events
+    env = dict(os.environ, SMARTART_EXIT_AFTER_STARTUP="1")
+    if headless:
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, SCRIPT], cwd=HERE, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    events = {}
+    try:
+        for line in proc.stdout:
+            if line.startswith("[startup] "):
+                _, event, _ = line.split()
+                events.setdefault(event, round(time.perf_counter() - start, 3))
+            if time.perf_counter() - start > timeout:
+                break
+    finally:
+        try:
+            proc.wait(timeout=max(0.1, timeout - (time.perf_counter() - start)))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    events["exit"] = round(time.perf_counter() - start, 3)
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure renderer startup times")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a run is killed")
+    parser.add_argument("--windowed", action="store_true", help="Use the real display instead of SDL's dummy driver")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        events = run_once(args.timeout, headless=not args.windowed)
+        runs.append(events)
+        print(f"run {i + 1}: " + ", ".join(f"{k}={v:.3f}s" for k, v in events.items()))
+
+    names = sorted({k for r in runs for k in r}, key=lambda k: statistics.median(r[k] for r in runs if k in r))
+    summary = {k: {"median_s": round(statistics.median(r[k] for r in runs if k in r), 3),
+                   "max_s": max(r[k] for r in runs if k in r),
+                   "runs": sum(k in r for r in runs)} for k in names}
+    print("\nmedian per event:")
+    for k, v in summary.items():
+        print(f"  {k:<16} {v['median_s']:.3f}s (max {v['max_s']:.3f}s, {v['runs']}/{len(runs)} runs)")
+
+    first = summary.get("first_frame")
+    ok = first is not None and first["max_s"] <= FIRST_FRAME_BUDGET
+    print(f"\nfirst frame within {FIRST_FRAME_BUDGET:.1f}s: {'yes' if ok else 'NO'}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": runs, "summary": summary, "first_frame_budget_s": FIRST_FRAME_BUDGET}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
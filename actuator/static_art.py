@@ -0,0 +1,101 @@
+# Drawing helpers for the static abstract visuals, shared by the single-screen
+# generator and the video-wall tiles. Shapes are placed in global canvas
+# coordinates from a caller-provided random generator, so every tile of a wall
+# that uses the same seed draws the same shapes and keeps only its own part.
+
+import random
+import pygame
+
+AI_FEATURES = ['light', 'temperature', 'humidity']
+
+# === UTILITY FUNCTIONS ===
+# Convert temperature to a color gradient, from blue on lower to red on upper temperatures
+def temp_to_color(temp):
+    TEMP_MIN, TEMP_MAX = 10, 40
+    t = max(0, min(1, (temp - TEMP_MIN) / (TEMP_MAX - TEMP_MIN)))
+    r = int((1 - t) * 50 + t * 255)
+    g = int((1 - t) * 150 + t * 50)
+    b = int((1 - t) * 255 + t * 50)
+    return (r, g, b)
+
+# Convert light level to a grayscale background color, darker on lower light levels
+def light_to_background(light):
+    L_MIN, L_MAX = 0, 1000
+    t = max(0, min(1, (light - L_MIN) / (L_MAX - L_MIN)))
+    v = int(t * 255)
+    return (v, v, v)
+
+# Blend real sensor values toward an AI suggestion
+def blend_sensor_values(real, ai_suggested, alpha=0.3, features=AI_FEATURES):
+    blended = {}
+    for key in features:
+        blended[key] = (1 - alpha) * real[key] + alpha * ai_suggested[key]
+    # Preserve 'motion' and any other keys from real sensor data
+    for key in real:
+        if key not in blended:
+            blended[key] = real[key]
+    return blended
+
+# Draw random shapes on the surface based on sensor data
+# canvas_size/offset place the surface inside a larger canvas (video wall tile)
+def draw_random_shapes(surface, base_color, count, opacity, chaos=20, rng=random, canvas_size=None, offset=(0, 0)):
+    # Shapes are generated for the whole canvas, then shifted into the surface
+    w, h = canvas_size or surface.get_size()
+    max_size = min(w, h) // 10 if min(w, h) > 200 else 60
+    # Draw on a surface padded by the largest shape extent (size + chaos + line width), so no shape
+    # reaching the visible area is clipped: pygame rasterizes clipped lines and polygons differently,
+    # which would make neighbouring video-wall tiles disagree at their seams
+    pad = max_size + chaos + 2
+    sw, sh = surface.get_size()
+    ox, oy = offset[0] - pad, offset[1] - pad
+    shape_surf = pygame.Surface((sw + 2 * pad, sh + 2 * pad), pygame.SRCALPHA)
+
+    for _ in range(count):
+        shape_type = rng.choice(["circle", "square", "triangle", "line"])
+        x = rng.randint(0, w)
+        y = rng.randint(0, h)
+        # Scale shape size to screen size
+        size = rng.randint(20, max_size)
+
+        # Randomly adjust the base color for each shape
+        r = max(0, min(255, base_color[0] + rng.randint(-30, 30)))
+        g = max(0, min(255, base_color[1] + rng.randint(-30, 30)))
+        b = max(0, min(255, base_color[2] + rng.randint(-30, 30)))
+
+        color = (r, g, b, opacity)
+        x -= ox
+        y -= oy
+
+        if shape_type == "circle":
+            pygame.draw.circle(shape_surf, color, (x, y), size)
+        elif shape_type == "square":
+            pygame.draw.rect(shape_surf, color, (x, y, size, size))
+        elif shape_type == "triangle":
+            points = [
+                (x, y),
+                (x + size + chaos, y + size // 2 - chaos),
+                (x + size // 2, y + size + chaos)
+            ]
+            pygame.draw.polygon(shape_surf, color, points)
+        elif shape_type == "line":
+            end_x = x + size + rng.randint(-chaos, chaos)
+            end_y = y + size + rng.randint(-chaos, chaos)
+            pygame.draw.line(shape_surf, color, (x, y), (end_x, end_y), width=2)
+
+    surface.blit(shape_surf, (0, 0), pygame.Rect(pad, pad, sw, sh)) # Draw the visible part on the surface
+
+# Draw a full static visual for the given sensor values
+def draw_static_visual(surface, params, rng=random, canvas_size=None, offset=(0, 0)):
+    surface.fill(light_to_background(params["light"]))
+
+    base_color = temp_to_color(params["temperature"])
+
+    count = int(30 + (params["humidity"] / 100) * 50)
+    opacity = max(30, int(255 - params["humidity"] * 1.5))
+
+    chaos = 0
+    if params["motion"] == 1:
+        chaos = 20
+        count += 20
+
+    draw_random_shapes(surface, base_color, count, opacity, chaos, rng, canvas_size, offset)
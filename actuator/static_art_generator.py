@@ -1,20 +1,32 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Reference point for the startup timings
 import pygame
-import random
 import math
 import json
 import threading
 import queue
-import paho.mqtt.client as mqtt
-import time
-import joblib
-import numpy as np
-import pandas as pd
+import os
+from transitions import TransitionEngine, BackgroundRenderer
+from static_art import blend_sensor_values, draw_static_visual
+# paho-mqtt, joblib, numpy/pandas and the AI model are imported in background threads,
+# so the first frame is on screen before they are loaded
+
+STARTUP_LOG = True  # Print "[startup] <event> <seconds>" lines (parsed by startup_benchmark.py)
+EXIT_AFTER_STARTUP = os.getenv("SMARTART_EXIT_AFTER_STARTUP") == "1"  # Quit once startup is complete (benchmark)
+
+def log_startup(event):
+    if STARTUP_LOG:
+        print(f"[startup] {event} {time.perf_counter() - STARTUP_T0:.3f}", flush=True)
 
 # === MQTT CONFIG ===
 MQTT_BROKER = "localhost" 
 MQTT_PORT = 1883
 MQTT_TOPIC_SENSOR = "smartart/sensor"
 MQTT_TOPIC_MOTION = "smartart/motion"
+# Redraw trigger: motion events the data proxy accepted (debounced, one per sensor_data entry).
+# Set SMARTART_REDRAW_TOPIC=smartart/motion to redraw on raw triggers when running without the proxy.
+MQTT_TOPIC_REDRAW = os.getenv("SMARTART_REDRAW_TOPIC", "smartart/visual")
+MQTT_SUBSCRIPTIONS = [(t, 0) for t in dict.fromkeys([MQTT_TOPIC_SENSOR, MQTT_TOPIC_MOTION, MQTT_TOPIC_REDRAW])]
 
 # === SENSOR DATA STATE ===
 # Initialize with some default values
@@ -28,37 +40,61 @@ sensor_data = {
 # === AI Model Integration ===
 AI_MODEL_PATH = "../ai_rating_model/best_rating_model.pkl"  # Adjust path if needed
 USE_AI_SUGGESTION = True  # Set to False to disable AI influence
+AI_STRATEGY = "thompson"  # "thompson" or "ucb" balance exploration; "greedy" always picks the predicted best
+features = ['light', 'temperature', 'humidity']
 
-try:
-    model = joblib.load(AI_MODEL_PATH)
-    features = ['light', 'temperature', 'humidity']
-except Exception as e:
-    print(f"Could not load AI model: {e}")
-    model = None
-
-def suggest_best_sensor_values(model, n_samples=100):
-    candidates = []
-    for _ in range(n_samples):
-        light = np.random.uniform(0, 1000)
-        temperature = np.random.uniform(10, 40)
-        humidity = np.random.uniform(30, 90)
-        candidates.append([light, temperature, humidity])
-    # Use DataFrame to match feature names and suppress sklearn warning
-    candidates_df = pd.DataFrame(candidates, columns=features)
-    preds = model.predict(candidates_df)
-    best_idx = np.argmax(preds)
-    best = candidates[best_idx]
-    return dict(zip(features, best))
-
-def blend_sensor_values(real, ai_suggested, alpha=0.3):
-    blended = {}
-    for key in features:
-        blended[key] = (1 - alpha) * real[key] + alpha * ai_suggested[key]
-    # Preserve 'motion' and any other keys from real sensor data
-    for key in real:
-        if key not in blended:
-            blended[key] = real[key]
-    return blended
+model = None
+suggestion_engine = None  # Set by the loader thread; visuals are drawn without AI until then
+ai_ready = threading.Event()  # Set when loading finished (successfully or not)
+
+def load_ai_model():
+    # Import the heavy libraries and unpickle the model off the main thread
+    global model, suggestion_engine
+    try:
+        import joblib
+        from suggestion_engine import SuggestionEngine  # Exploration-aware AI suggestions (numpy/pandas)
+        loaded = joblib.load(AI_MODEL_PATH)
+        suggestion_engine = SuggestionEngine(loaded, features, strategy=AI_STRATEGY)  # Caches per-tree statistics once
+        model = loaded
+        log_startup("model_ready")
+    except Exception as e:
+        print(f"Could not load AI model: {e}")
+        log_startup("model_failed")
+    finally:
+        ai_ready.set()
+
+def suggest_best_sensor_values():
+    # Next sensor vector to blend toward, chosen from the engine's cached statistics
+    _, suggested = suggestion_engine.suggest()
+    return suggested
+
+# === THUMBNAIL EXPORT ===
+# Each rendered visual is exported as a small JPEG so the Telegram bot can show what is being rated
+THUMBNAIL_DIR = os.getenv("SMARTART_THUMBNAIL_DIR",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "thumbnails"))
+THUMBNAIL_WIDTH = 640  # Thumbnail width in pixels (height keeps the screen aspect ratio)
+THUMBNAIL_KEEP = 200  # Number of most recent thumbnails kept on disk
+
+def export_thumbnail(surface):
+    # Called when a visual goes on screen; the surface is never drawn on again, so scale and save it in the background
+    # Name files by display time (ms) so the bot can match them to the visual's timestamp
+    name = f"visual_{int(time.time() * 1000)}.jpg"
+    threading.Thread(target=_save_thumbnail, args=(surface, name), daemon=True).start()
+
+def _save_thumbnail(surface, name):
+    try:
+        w, h = surface.get_size()
+        thumb = pygame.transform.smoothscale(surface, (THUMBNAIL_WIDTH, max(1, int(h * THUMBNAIL_WIDTH / w))))
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        tmp_path = os.path.join(THUMBNAIL_DIR, "." + name)
+        pygame.image.save(thumb, tmp_path)
+        os.replace(tmp_path, os.path.join(THUMBNAIL_DIR, name))  # Atomic, readers never see partial files
+        # Prune old thumbnails
+        files = sorted(f for f in os.listdir(THUMBNAIL_DIR) if f.startswith("visual_"))
+        for old in files[:-THUMBNAIL_KEEP]:
+            os.remove(os.path.join(THUMBNAIL_DIR, old))
+    except Exception as e:
+        print("Thumbnail export error:", e)
 
 # === REDRAW QUEUE FOR THREAD-SAFE SIGNALING ===
 redraw_queue = queue.Queue()
@@ -73,24 +109,34 @@ def on_message(client, userdata, msg):
             sensor_data.update(data) # Update the sensor data with the new values
         elif msg.topic == MQTT_TOPIC_MOTION:
             sensor_data["motion"] = int(data["motion"]) # Update motion state
-            if sensor_data["motion"] == 1:
+        if msg.topic == MQTT_TOPIC_REDRAW:
+            sensor_data.update(data) # The proxy's snapshot: draw exactly the values recorded for this visual
+            if int(sensor_data["motion"]) == 1:
                 # Signal main thread to redraw
                 redraw_queue.put(True)
     except Exception as e: # Handle JSON decoding errors
         print("MQTT Message Error:", e) 
 
+def on_connect(client, userdata, flags, rc):
+    # (Re)subscribe on every connection, so a broker restart does not silence the wall
+    if rc == 0:
+        client.subscribe(MQTT_SUBSCRIPTIONS)
+        log_startup("mqtt_connected")
+    else:
+        print(f"MQTT connection refused (rc={rc}), retrying...")
+
 # === MQTT THREAD ===
 def mqtt_thread():
+    import paho.mqtt.client as mqtt
     client = mqtt.Client()
-    client.connect(MQTT_BROKER, MQTT_PORT)
-    client.subscribe([(MQTT_TOPIC_SENSOR, 0), (MQTT_TOPIC_MOTION, 0)])
+    client.on_connect = on_connect
     client.on_message = on_message
-    client.loop_forever()
-
-threading.Thread(target=mqtt_thread, daemon=True).start() # Start MQTT thread
+    client.reconnect_delay_set(min_delay=1, max_delay=30)  # Exponential backoff between attempts
+    client.connect_async(MQTT_BROKER, MQTT_PORT)  # Does not block or fail if the broker is not up yet
+    client.loop_forever(retry_first_connection=True)
 
 # === PYGAME SETUP ===
-pygame.init()
+pygame.display.init()  # Only the display is needed; skipping audio/joystick init speeds up startup
 info = pygame.display.Info() # Get display informations
 WIDTH, HEIGHT = info.current_w, info.current_h # Use full screen size
 screen = pygame.display.set_mode((WIDTH, HEIGHT)) # Create the Pygame window
@@ -98,87 +144,41 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT)) # Create the Pygame window
 pygame.display.set_caption("Smart Wall Art: Static Abstract") # Set the window title
 clock = pygame.time.Clock() # Create a clock to control the frame rate
 
-# === UTILITY FUNCTIONS ===
-# Convert temperature to a color gradient, from blue on lower to red on upper temperatures
-def temp_to_color(temp):
-    TEMP_MIN, TEMP_MAX = 10, 40
-    t = max(0, min(1, (temp - TEMP_MIN) / (TEMP_MAX - TEMP_MIN)))
-    r = int((1 - t) * 50 + t * 255)
-    g = int((1 - t) * 150 + t * 50)
-    b = int((1 - t) * 255 + t * 50)
-    return (r, g, b)
-
-# Convert light level to a grayscale background color, darker on lower light levels
-def light_to_background(light):
-    L_MIN, L_MAX = 0, 1000
-    t = max(0, min(1, (light - L_MIN) / (L_MAX - L_MIN)))
-    v = int(t * 255)
-    return (v, v, v)
-
-# Draw random shapes on the surface based on sensor data 
-def draw_random_shapes(surface, base_color, count, opacity, chaos=20):
-    # Always use current surface size for all drawing
-    w, h = surface.get_size()
-    shape_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-
-    for _ in range(count):
-        shape_type = random.choice(["circle", "square", "triangle", "line"])
-        x = random.randint(0, w)
-        y = random.randint(0, h)
-        # Scale shape size to screen size
-        size = random.randint(20, min(w, h) // 10 if min(w, h) > 200 else 60)
-
-        # Randomly adjust the base color for each shape 
-        r = max(0, min(255, base_color[0] + random.randint(-30, 30)))
-        g = max(0, min(255, base_color[1] + random.randint(-30, 30)))
-        b = max(0, min(255, base_color[2] + random.randint(-30, 30)))
-
-        color = (r, g, b, opacity)
-
-        if shape_type == "circle":
-            pygame.draw.circle(shape_surf, color, (x, y), size)
-        elif shape_type == "square":
-            pygame.draw.rect(shape_surf, color, (x, y, size, size))
-        elif shape_type == "triangle":
-            points = [
-                (x, y),
-                (x + size + chaos, y + size // 2 - chaos),
-                (x + size // 2, y + size + chaos)
-            ]
-            pygame.draw.polygon(shape_surf, color, points)
-        elif shape_type == "line":
-            end_x = x + size + random.randint(-chaos, chaos)
-            end_y = y + size + random.randint(-chaos, chaos)
-            pygame.draw.line(shape_surf, color, (x, y), (end_x, end_y), width=2)
-
-    surface.blit(shape_surf, (0, 0)) # Draw the shapes on the surface
+# === TRANSITIONS ===
+TRANSITION_MODE = "fade"  # "fade" (cross-fade) or "wipe"
+TRANSITION_FRAMES = 30  # Frames per transition (1 s at TRANSITION_FPS)
+TRANSITION_FPS = 30  # Frame rate while a transition runs
+IDLE_FPS = 10  # Frame rate while the visual is static
 
 # === INITIAL DRAWING ===
-# Draw the initial static image based on sensor data
-def draw_static_image():
+# Snapshot the sensor data (optionally blended with the AI suggestion) for the next visual
+def next_visual_params():
     global sensor_data
     # Optionally blend sensor data with AI suggestion
-    if USE_AI_SUGGESTION and model is not None:
-        ai_suggested = suggest_best_sensor_values(model)
+    if USE_AI_SUGGESTION and suggestion_engine is not None:
+        ai_suggested = suggest_best_sensor_values()
         sensor_data = blend_sensor_values(sensor_data, ai_suggested, alpha=0.3)
+    return dict(sensor_data)
 
-    screen.fill(light_to_background(sensor_data["light"]))
-
-    base_color = temp_to_color(sensor_data["temperature"])
-
-    count = int(30 + (sensor_data["humidity"] / 100) * 50)
-    opacity = max(30, int(255 - sensor_data["humidity"] * 1.5))
-
-    chaos = 0
-    if sensor_data["motion"] == 1:
-        chaos = 20
-        count += 20
+# Render a static image for the given sensor data on an off-screen surface (safe on a worker thread)
+def render_static_image(params):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    draw_static_visual(surface, params)
+    return surface
 
-    draw_random_shapes(screen, base_color, count, opacity, chaos)
-    pygame.display.flip()
+# Request a new visual; it is rendered in the background and faded in by the main loop
+def draw_static_image():
+    renderer.submit(next_visual_params())
 
 # === MAIN LOOP ===
-draw_static_image()
+transitions = TransitionEngine(screen, TRANSITION_FRAMES, TRANSITION_MODE)
+first_frame = render_static_image(dict(sensor_data))
+transitions.show(first_frame)  # First frame with default values, before anything else loads
+export_thumbnail(first_frame)
+log_startup("first_frame")
+renderer = BackgroundRenderer(render_static_image)
+threading.Thread(target=load_ai_model, daemon=True).start()  # Load the AI model in the background
+threading.Thread(target=mqtt_thread, daemon=True).start() # Start MQTT thread
 running = True
 
 while running:
@@ -197,6 +197,17 @@ while running:
     except Exception:
         pass
 
-    clock.tick(10) # Control the frame rate
+    # Start a transition as soon as a background render is ready, then advance it
+    # Only visuals that actually go on screen get a thumbnail (superseded renders never reach here)
+    finished = renderer.poll()
+    if finished is not None:
+        transitions.start(finished)
+        export_thumbnail(finished)
+    transitions.step()
+
+    if EXIT_AFTER_STARTUP and ai_ready.is_set():
+        running = False # Startup benchmark: stop once the model is loaded
+
+    clock.tick(TRANSITION_FPS if transitions.active else IDLE_FPS) # Control the frame rate
 
 pygame.quit()
@@ -0,0 +1,92 @@
+# Exploration-aware AI suggestions for the art generators.
+# Instead of always blending toward the argmax of the forest prediction, the
+# engine keeps a fixed pool of candidate sensor vectors and caches, once per
+# model, the mean and spread of the RandomForest's per-tree predictions for each
+# candidate. Each redraw then picks a candidate with Thompson sampling or UCB
+# from those cached arrays (no model calls, constant time per redraw), and the
+# exploration bonus of a candidate shrinks every time it is shown.
+
+# Import required libraries
+import numpy as np  # For vectorized candidate statistics
+import pandas as pd  # For feature-named model input
+
+
+# Candidate ranges, same as the original random-search suggestion
+FEATURE_BOUNDS = {
+    'light': (0, 1000),
+    'temperature': (10, 40),
+    'humidity': (30, 90),
+}
+STRATEGIES = ('thompson', 'ucb', 'greedy')
+
+
+def greedy_suggestion(model, features, n_samples=100, rng=None):
+    # Original strategy: argmax of the forest prediction over fresh random candidates
+    rng = rng or np.random.default_rng()
+    lows = [FEATURE_BOUNDS[f][0] for f in features]
+    highs = [FEATURE_BOUNDS[f][1] for f in features]
+    candidates = rng.uniform(lows, highs, size=(n_samples, len(features)))
+    # Use DataFrame to match feature names and suppress sklearn warning
+    preds = model.predict(pd.DataFrame(candidates, columns=features))
+    return dict(zip(features, candidates[int(np.argmax(preds))]))
+
+
+class SuggestionEngine:
+    def __init__(self, model, features, strategy='thompson', n_candidates=512, beta=1.0,
+                 min_std=0.25, seed=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.features = list(features)
+        self.strategy = strategy
+        self.beta = beta  # UCB exploration weight
+        self.min_std = min_std  # Floor on uncertainty, so no candidate is ever ruled out forever
+        self.rng = np.random.default_rng(seed)
+        lows = np.array([FEATURE_BOUNDS[f][0] for f in self.features], dtype=float)
+        highs = np.array([FEATURE_BOUNDS[f][1] for f in self.features], dtype=float)
+        self.candidates = self.rng.uniform(lows, highs, size=(n_candidates, len(self.features)))
+        self.shown = np.zeros(n_candidates)  # Times each candidate was suggested
+        self.rating_sum = np.zeros(n_candidates)  # Ratings observed directly for a candidate
+        self.rating_count = np.zeros(n_candidates)
+        self.refresh(model)
+
+    def refresh(self, model):
+        # Recompute cached per-candidate statistics for a (re)trained model
+        X = pd.DataFrame(self.candidates, columns=self.features)
+        estimators = getattr(model, 'estimators_', None)
+        if estimators:
+            # Per-tree predictions; trees were fitted on plain arrays, so pass values
+            per_tree = np.stack([tree.predict(X.values) for tree in estimators])
+            self.mean = per_tree.mean(axis=0)
+            self.std = per_tree.std(axis=0)
+        else:
+            self.mean = np.asarray(model.predict(X), dtype=float)
+            self.std = np.zeros(len(self.candidates))
+        self.std = np.maximum(self.std, self.min_std)
+        self.shown[:] = 0  # The new model already accounts for what was shown before
+        self.rating_sum[:] = 0
+        self.rating_count[:] = 0
+
+    def _posterior(self):
+        # Combine the model's prior with ratings observed since the last refresh
+        n = self.rating_count
+        mean = (self.mean + self.rating_sum) / (1 + n)
+        std = self.std / np.sqrt(1 + self.shown)
+        return mean, std
+
+    def suggest(self):
+        # Pick a candidate for the next redraw; returns (index, sensor dict)
+        mean, std = self._posterior()
+        if self.strategy == 'thompson':
+            scores = self.rng.normal(mean, std)
+        elif self.strategy == 'ucb':
+            scores = mean + self.beta * std
+        else:
+            scores = mean
+        idx = int(np.argmax(scores))
+        self.shown[idx] += 1
+        return idx, dict(zip(self.features, self.candidates[idx]))
+
+    def observe(self, idx, rating):
+        # Feed back a rating for a suggested candidate (used when ratings arrive before retraining)
+        self.rating_sum[idx] += rating
+        self.rating_count[idx] += 1
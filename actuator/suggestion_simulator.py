@@ -0,0 +1,141 @@
+# Offline simulator comparing AI suggestion strategies.
+# A synthetic audience rates each visual with a hidden preference function of
+# the (blended) sensor values. Every strategy starts from the same warm-up
+# ratings, the forest is retrained periodically like train_rating_model.py,
+# and the report shows how fast the average rating converges per strategy and
+# how long a single suggestion takes.
+
+# Import required libraries
+import json  # For the JSON report
+import time  # For timing suggestions
+import argparse  # For command line options
+import numpy as np  # For the synthetic environment
+import pandas as pd  # For feature-named training data
+from sklearn.ensemble import RandomForestRegressor  # Same model family as train_rating_model.py
+from suggestion_engine import SuggestionEngine, greedy_suggestion, FEATURE_BOUNDS
+
+
+# === Config ===
+FEATURES = ['light', 'temperature', 'humidity']
+ALPHA = 0.3  # Same blend factor as the static generator
+WARMUP = 20  # Random ratings collected before the first model
+RETRAIN_EVERY = 25  # Ratings between retrains
+ROUNDS = 300  # Visuals shown per run
+WINDOW = 25  # Moving-average window for convergence
+
+
+# === Synthetic Audience ===
+class Audience:
+    # Hidden preference: a Gaussian bump somewhere in sensor space, with noisy integer ratings
+    def __init__(self, rng):
+        self.rng = rng
+        self.lows = np.array([FEATURE_BOUNDS[f][0] for f in FEATURES], dtype=float)
+        self.highs = np.array([FEATURE_BOUNDS[f][1] for f in FEATURES], dtype=float)
+        self.peak = rng.uniform(self.lows, self.highs)
+        self.scale = 0.25 * (self.highs - self.lows)
+
+    def rate(self, x):
+        z = (np.asarray(x) - self.peak) / self.scale
+        score = 5 * np.exp(-0.5 * np.dot(z, z)) + self.rng.normal(0, 0.5)
+        return int(np.clip(np.rint(score), 0, 5))
+
+    def room(self):
+        # Real sensor readings of a fairly stable room
+        center = self.lows + 0.5 * (self.highs - self.lows)
+        return np.clip(self.rng.normal(center, 0.1 * (self.highs - self.lows)), self.lows, self.highs)
+
+
+def blend(real, suggested):
+    return (1 - ALPHA) * real + ALPHA * suggested
+
+
+def train(X, y, seed):
+    model = RandomForestRegressor(n_estimators=100, random_state=seed, n_jobs=-1)
+    model.fit(pd.DataFrame(X, columns=FEATURES), y)
+    return model
+
+
+# === Simulation ===
+def simulate(strategy, seed, rounds=ROUNDS):
+    rng = np.random.default_rng(seed)
+    audience = Audience(rng)
+    X, y = [], []
+    for _ in range(WARMUP):
+        x = audience.room()
+        X.append(x)
+        y.append(audience.rate(x))
+
+    model = train(X, y, seed)
+    engine = None if strategy == 'current' else SuggestionEngine(model, FEATURES, strategy=strategy, seed=seed)
+    ratings, suggest_times = [], []
+    for r in range(rounds):
+        start = time.perf_counter()
+        if engine is None:
+            suggested = greedy_suggestion(model, FEATURES, rng=rng)
+            idx = None
+        else:
+            idx, suggested = engine.suggest()
+        suggest_times.append(time.perf_counter() - start)
+
+        x = blend(audience.room(), np.array([suggested[f] for f in FEATURES]))
+        rating = audience.rate(x)
+        ratings.append(rating)
+        X.append(x)
+        y.append(rating)
+        if engine is not None:
+            engine.observe(idx, rating)
+
+        if (r + 1) % RETRAIN_EVERY == 0:
+            model = train(X, y, seed)
+            if engine is not None:
+                engine.refresh(model)
+    return ratings, suggest_times
+
+
+def summarize(all_ratings, all_times, target):
+    curves = np.array(all_ratings, dtype=float)
+    mean_curve = curves.mean(axis=0)
+    moving = np.convolve(mean_curve, np.ones(WINDOW) / WINDOW, mode='valid')
+    reached = np.nonzero(moving >= target)[0]
+    times = np.concatenate(all_times)
+    return {
+        'mean_rating': round(float(mean_curve.mean()), 3),
+        'final_window_rating': round(float(moving[-1]), 3),
+        'rounds_to_target': int(reached[0] + WINDOW) if len(reached) else None,
+        'suggest_us_p50': round(float(np.median(times)) * 1e6, 1),
+        'suggest_us_p99': round(float(np.percentile(times, 99)) * 1e6, 1),
+        'moving_average': [round(float(v), 3) for v in moving[::WINDOW]],
+    }
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description="Compare AI suggestion strategies on a synthetic audience")
+    parser.add_argument('--strategies', nargs='+', default=['current', 'thompson', 'ucb'],
+                        choices=['current', 'thompson', 'ucb', 'greedy'])
+    parser.add_argument('--seeds', type=int, default=5, help="Independent runs per strategy")
+    parser.add_argument('--rounds', type=int, default=ROUNDS)
+    parser.add_argument('--target', type=float, default=2.5, help="Moving-average rating counted as converged")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for strategy in args.strategies:
+        all_ratings, all_times = [], []
+        for seed in range(args.seeds):
+            ratings, times = simulate(strategy, seed, args.rounds)
+            all_ratings.append(ratings)
+            all_times.append(times)
+        report[strategy] = summarize(all_ratings, all_times, args.target)
+        s = report[strategy]
+        print(f"{strategy:>9}: mean={s['mean_rating']:.2f} final={s['final_window_rating']:.2f} "
+              f"rounds_to_{args.target}={s['rounds_to_target']} suggest p50={s['suggest_us_p50']}us")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
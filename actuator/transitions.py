@@ -0,0 +1,108 @@
+# Transition engine for the static generator.
+# The previous and next visuals are kept as cached surfaces; every display
+# frame is composed from them with one or two blits (alpha cross-fade or a
+# sliding wipe), so a transition costs the same whatever the visual contains.
+# New visuals are rendered off-screen by a background worker, so the visible
+# frame rate never waits for drawing.
+
+import time
+import queue
+import threading
+import pygame
+
+MODES = ("fade", "wipe")
+
+
+class TransitionEngine:
+    def __init__(self, screen, frames=20, mode="fade"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown transition mode {mode!r}, expected one of {MODES}")
+        self.screen = screen
+        self.frames = max(1, frames)  # Display frames a transition lasts
+        self.mode = mode
+        self.current = screen.copy()  # What is on screen when no transition runs
+        self.next = None
+        self.frame = 0
+        self.started_at = None  # Wall-clock start of a timed transition
+        self.duration = None  # Seconds; None = frame-based
+
+    @property
+    def active(self):
+        return self.next is not None
+
+    def start(self, surface, started_at=None, duration=None):
+        # Begin transitioning to `surface`; an ongoing transition continues from what is visible now
+        # With a duration (seconds), progress follows the wall clock from started_at instead of the frame
+        # count, so displays that render at different rates still show the same blend at the same moment
+        if self.active:
+            self.current = self.screen.copy()
+        self.next = surface.convert()  # Display pixel format makes the per-frame blits cheap
+        self.frame = 0
+        self.duration = duration
+        self.started_at = time.time() if started_at is None else started_at
+
+    def step(self):
+        # Compose and flip the next transition frame; returns False once idle
+        if not self.active:
+            return False
+        self.frame += 1
+        if self.duration:
+            t = min(1.0, max(0.0, (time.time() - self.started_at) / self.duration))
+        else:
+            t = min(1.0, self.frame / self.frames)
+        t = t * t * (3 - 2 * t)  # Ease in/out
+        if self.mode == "fade":
+            self.screen.blit(self.current, (0, 0))
+            self.next.set_alpha(int(255 * t))
+            self.screen.blit(self.next, (0, 0))
+        else:
+            w, h = self.screen.get_size()
+            edge = int(w * t)
+            self.screen.blit(self.current, (0, 0))
+            self.screen.blit(self.next, (0, 0), pygame.Rect(0, 0, edge, h))  # Reveal left to right
+        pygame.display.flip()
+        if t >= 1.0:
+            self.next.set_alpha(None)
+            self.current, self.next = self.next, None
+        return True
+
+    def show(self, surface):
+        # Display `surface` immediately, without a transition
+        self.current = surface.convert()
+        self.next = None
+        self.screen.blit(self.current, (0, 0))
+        pygame.display.flip()
+
+
+class BackgroundRenderer:
+    # Renders visuals on a worker thread; only the newest pending request is rendered
+    def __init__(self, render):
+        self.render = render  # Callable(params) -> pygame.Surface, must not touch the display
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, params):
+        self.requests.put(params)
+
+    def poll(self):
+        # Newest finished surface, or None
+        surface = None
+        while True:
+            try:
+                surface = self.results.get_nowait()
+            except queue.Empty:
+                return surface
+
+    def _worker(self):
+        while True:
+            params = self.requests.get()
+            while True:  # Skip requests superseded while we were busy
+                try:
+                    params = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self.results.put(self.render(params))
+            except Exception as e:
+                print("Background render error:", e)
@@ -0,0 +1,172 @@
+# Coordinator for tiled video-wall rendering.
+# Listens to the sensor topics like the single-screen generator, and on every
+# motion trigger computes the scene parameters once (sensor snapshot, AI blend,
+# random seed) and broadcasts them on MQTT with a common flip deadline. Each
+# panel runs wall_tile.py, renders only its part of the global canvas from the
+# same parameters and flips at the deadline, so the whole wall changes at once.
+# Tiles acknowledge each scene; when one misses the deadline the lead time
+# is increased, and it slowly shrinks again while every tile is on time.
+
+import os
+import time
+import json
+import random
+import argparse
+import threading
+import paho.mqtt.client as mqtt
+from static_art import blend_sensor_values
+
+# === MQTT CONFIG ===
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+MQTT_TOPIC_SENSOR = "smartart/sensor"
+MQTT_TOPIC_MOTION = "smartart/motion"
+# Redraw trigger: motion events the data proxy accepted (debounced, one per sensor_data entry).
+# Set SMARTART_REDRAW_TOPIC=smartart/motion to redraw on raw triggers when running without the proxy.
+MQTT_TOPIC_REDRAW = os.getenv("SMARTART_REDRAW_TOPIC", "smartart/visual")
+MQTT_TOPIC_SCENE = "smartart/wall/scene"  # Retained, so a restarted tile picks up the current scene
+MQTT_TOPIC_READY = "smartart/wall/ready"  # Tile acknowledgements
+
+# === AI Model Integration ===
+AI_MODEL_PATH = "../ai_rating_model/best_rating_model.pkl"  # Adjust path if needed
+USE_AI_SUGGESTION = True  # Set to False to disable AI influence
+AI_STRATEGY = "thompson"
+
+# === SYNC CONFIG ===
+MIN_LEAD = 0.3  # Seconds between broadcast and flip, lower bound
+MAX_LEAD = 5.0  # Upper bound when tiles are slow
+
+# === SENSOR DATA STATE ===
+sensor_data = {
+    "light": 300,
+    "temperature": 22,
+    "humidity": 50,
+    "motion": 0
+}
+
+
+class Coordinator:
+    def __init__(self, client, canvas, tiles, lead, transition_duration):
+        self.client = client
+        self.canvas = canvas  # (width, height) of the whole wall in pixels
+        self.tiles = tiles  # Expected number of tiles (0 = unknown, only used for reporting)
+        self.lead = lead
+        self.transition_duration = transition_duration  # Seconds, timed by the wall clock on every tile
+        self.scene_id = 0
+        self.acks = {}  # scene_id -> {tile: late}
+        self.lock = threading.Lock()
+        self.engine = None
+        threading.Thread(target=self._load_ai_model, daemon=True).start()
+
+    def _load_ai_model(self):
+        # Same model and suggestion engine as the single-screen generator, loaded off the main thread
+        if not USE_AI_SUGGESTION:
+            return
+        try:
+            import joblib
+            from suggestion_engine import SuggestionEngine
+            self.engine = SuggestionEngine(joblib.load(AI_MODEL_PATH), ['light', 'temperature', 'humidity'],
+                                           strategy=AI_STRATEGY)
+        except Exception as e:
+            print(f"Could not load AI model: {e}")
+
+    def broadcast(self):
+        # Compute the scene once and publish it to every tile
+        # Called from the MQTT thread and the stdin loop: the whole computation runs under the lock,
+        # and publishing inside it keeps the retained scene the newest one
+        global sensor_data
+        with self.lock:
+            if self.engine is not None:
+                _, suggested = self.engine.suggest()
+                sensor_data = blend_sensor_values(sensor_data, suggested, alpha=0.3)
+            self.scene_id += 1
+            scene = {
+                "scene_id": self.scene_id,
+                "seed": random.getrandbits(32),  # Every tile draws the same shapes from this seed
+                "sensor": dict(sensor_data),
+                "canvas": list(self.canvas),
+                "flip_at": time.time() + self.lead,  # Wall clock; panels must be NTP-synced
+                "transition_duration": self.transition_duration,
+            }
+            self.acks[self.scene_id] = {}
+            for old in [s for s in self.acks if s < self.scene_id - 10]:
+                del self.acks[old]
+            self.client.publish(MQTT_TOPIC_SCENE, json.dumps(scene), qos=1, retain=True)
+            lead = self.lead
+        print(f"[wall] scene {scene['scene_id']} seed={scene['seed']} flip in {lead:.2f}s")
+
+    def update_sensors(self, data):
+        # Merge new readings under the lock, so a scene never sees a half-applied update
+        with self.lock:
+            sensor_data.update(data)
+
+    def on_ready(self, ack):
+        # Adapt the lead time from the tiles' acknowledgements
+        with self.lock:
+            acks = self.acks.get(ack.get("scene_id"))
+            if acks is None:
+                return
+            acks[ack.get("tile")] = bool(ack.get("late"))
+            if ack.get("late"):
+                self.lead = min(MAX_LEAD, self.lead * 1.5)
+                print(f"[wall] tile {ack.get('tile')} missed the flip by {ack.get('late_by', 0):.3f}s, "
+                      f"lead -> {self.lead:.2f}s")
+            elif self.tiles and len(acks) == self.tiles and not any(acks.values()):
+                self.lead = max(MIN_LEAD, self.lead * 0.95)  # Everyone on time: tighten a little
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast synchronized scenes to video-wall tiles")
+    parser.add_argument("--canvas", default="3840x1080", help="Size of the whole wall in pixels, WxH")
+    parser.add_argument("--tiles", type=int, default=0, help="Number of tiles expected to acknowledge")
+    parser.add_argument("--lead", type=float, default=1.0, help="Initial seconds between broadcast and flip")
+    parser.add_argument("--transition-duration", type=float, default=1.0,
+                        help="Cross-fade length in seconds, the same on every tile")
+    args = parser.parse_args()
+    canvas = tuple(int(v) for v in args.canvas.lower().split("x"))
+
+    client = mqtt.Client()
+    coordinator = Coordinator(client, canvas, args.tiles, args.lead, args.transition_duration)
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            topics = dict.fromkeys([MQTT_TOPIC_SENSOR, MQTT_TOPIC_MOTION, MQTT_TOPIC_REDRAW])
+            client.subscribe([(t, 0) for t in topics] + [(MQTT_TOPIC_READY, 1)])
+
+    def on_message(client, userdata, msg):
+        try:
+            data = json.loads(msg.payload.decode()) # Decode the JSON payload
+            if msg.topic == MQTT_TOPIC_SENSOR:
+                coordinator.update_sensors(data) # Update the sensor data with the new values
+            elif msg.topic == MQTT_TOPIC_MOTION:
+                coordinator.update_sensors({"motion": int(data["motion"])}) # Update motion state
+            elif msg.topic == MQTT_TOPIC_READY:
+                coordinator.on_ready(data)
+            if msg.topic == MQTT_TOPIC_REDRAW:
+                coordinator.update_sensors(data) # The proxy's snapshot: draw exactly the values recorded for this visual
+                if int(data.get("motion", 0)) == 1:
+                    coordinator.broadcast()
+        except Exception as e:
+            print("MQTT Message Error:", e)
+
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    client.connect_async(MQTT_BROKER, MQTT_PORT)
+    client.loop_start()
+    print(f"[wall] coordinating a {canvas[0]}x{canvas[1]} canvas; press Enter to force a new scene, Ctrl+C to quit")
+    try:
+        while True:
+            try:
+                input()
+            except EOFError:
+                threading.Event().wait()  # No terminal (e.g. run as a service): just keep running
+            coordinator.broadcast()
+    except KeyboardInterrupt:
+        pass
+    client.loop_stop()
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Seam check for the video-wall tiles.
+# Renders the same scene once as the full canvas and once per tile (as
+# wall_tile.py does), reassembles the tiles and compares them pixel by pixel
+# with the full render, over many seeds and with and without motion.
+# Exits 1 if any tile differs, so it can gate changes to static_art.py.
+
+# Import required libraries
+import os  # For the headless video driver
+import sys  # For the exit status
+import random  # For seeded scenes
+import argparse  # For command line options
+import pygame  # For off-screen rendering
+from static_art import draw_static_visual  # What the tiles draw
+from wall_tile import tile_rect  # How the canvas is split between tiles
+
+
+def check_scene(canvas, cols, rows, params, seed):
+    # Return (mismatched pixels, largest channel difference) between the full render and its tiles
+    full = pygame.Surface(canvas)
+    draw_static_visual(full, params, rng=random.Random(seed))
+    mismatched, worst = 0, 0
+    for row in range(rows):
+        for col in range(cols):
+            x, y, w, h = tile_rect(canvas, cols, rows, col, row)
+            tile = pygame.Surface((w, h))
+            draw_static_visual(tile, params, rng=random.Random(seed), canvas_size=canvas, offset=(x, y))
+            expected = pygame.image.tobytes(full.subsurface((x, y, w, h)), "RGB")
+            actual = pygame.image.tobytes(tile, "RGB")
+            if expected == actual:
+                continue
+            for i in range(0, len(expected), 3):
+                diff = max(abs(expected[i + c] - actual[i + c]) for c in range(3))
+                if diff:
+                    mismatched += 1
+                    worst = max(worst, diff)
+    return mismatched, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that video-wall tiles reassemble into the full canvas")
+    parser.add_argument("--canvas", default="400x200", help="Canvas size in pixels, WxH")
+    parser.add_argument("--cols", type=int, default=2, help="Tiles per row")
+    parser.add_argument("--rows", type=int, default=1, help="Tiles per column")
+    parser.add_argument("--seeds", type=int, default=30, help="Number of seeds to check")
+    args = parser.parse_args()
+    canvas = tuple(int(v) for v in args.canvas.lower().split("x"))
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+
+    failures = 0
+    for seed in range(args.seeds):
+        for motion in (0, 1):
+            params = {"light": 400, "temperature": 25, "humidity": 40, "motion": motion}
+            mismatched, worst = check_scene(canvas, args.cols, args.rows, params, seed)
+            if mismatched:
+                failures += 1
+                print(f"seed {seed} motion {motion}: {mismatched} pixels differ (up to {worst} levels)")
+    total = args.seeds * 2
+    print(f"{total - failures}/{total} scenes reassemble exactly "
+          f"({args.cols}x{args.rows} tiles on {canvas[0]}x{canvas[1]})")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
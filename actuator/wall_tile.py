@@ -0,0 +1,143 @@
+# One panel of a tiled video wall (see wall_coordinator.py).
+# Receives scene parameters over MQTT, renders only its rectangle of the global
+# canvas in a background thread (seeded, so all tiles agree on every shape),
+# acknowledges the scene, and starts the transition at the shared flip time.
+
+import time
+import json
+import queue
+import random
+import argparse
+import pygame
+import paho.mqtt.client as mqtt
+from static_art import draw_static_visual
+from transitions import TransitionEngine, BackgroundRenderer
+
+# === MQTT CONFIG ===
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+MQTT_TOPIC_SCENE = "smartart/wall/scene"
+MQTT_TOPIC_READY = "smartart/wall/ready"
+
+IDLE_FPS = 10  # Frame rate while the visual is static
+TRANSITION_FPS = 30  # Frame rate cap while a transition runs; progress is timed, so slower panels stay in step
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render one tile of the SmartArt video wall")
+    parser.add_argument("--canvas", default="3840x1080", help="Size of the whole wall in pixels, WxH")
+    parser.add_argument("--cols", type=int, default=2, help="Tiles per row")
+    parser.add_argument("--rows", type=int, default=1, help="Tiles per column")
+    parser.add_argument("--col", type=int, default=0, help="This tile's column (0-based)")
+    parser.add_argument("--row", type=int, default=0, help="This tile's row (0-based)")
+    parser.add_argument("--name", help="Tile name used in acknowledgements (default: r<row>c<col>)")
+    parser.add_argument("--windowed", action="store_true", help="Open a window of the tile size instead of full screen")
+    args = parser.parse_args()
+    args.canvas = tuple(int(v) for v in args.canvas.lower().split("x"))
+    args.name = args.name or f"r{args.row}c{args.col}"
+    return args
+
+
+def tile_rect(canvas, cols, rows, col, row):
+    # Pixel rectangle (x, y, w, h) of a tile; integer edges so neighbouring tiles never overlap or leave gaps
+    cw, ch = canvas
+    x0, x1 = col * cw // cols, (col + 1) * cw // cols
+    y0, y1 = row * ch // rows, (row + 1) * ch // rows
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def main():
+    args = parse_args()
+    x, y, w, h = tile_rect(args.canvas, args.cols, args.rows, args.col, args.row)
+
+    # === PYGAME SETUP ===
+    pygame.display.init()
+    if args.windowed:
+        screen = pygame.display.set_mode((w, h))
+    else:
+        info = pygame.display.Info()
+        screen = pygame.display.set_mode((info.current_w, info.current_h))
+    pygame.display.set_caption(f"Smart Wall Art: tile {args.name}")
+    clock = pygame.time.Clock()
+    display_size = screen.get_size()
+
+    def render(scene):
+        # Deterministic: same seed and canvas on every tile, only the offset differs
+        surface = pygame.Surface((w, h))
+        draw_static_visual(surface, scene["sensor"], rng=random.Random(scene["seed"]),
+                           canvas_size=tuple(scene["canvas"]), offset=(x, y))
+        if (w, h) != display_size:
+            surface = pygame.transform.smoothscale(surface, display_size)  # Panel resolution differs from tile
+        return scene, surface
+
+    transitions = TransitionEngine(screen)
+    renderer = BackgroundRenderer(render)
+    scenes = queue.Queue()
+
+    # === MQTT ===
+    client = mqtt.Client()
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            client.subscribe(MQTT_TOPIC_SCENE, qos=1)
+
+    def on_message(client, userdata, msg):
+        try:
+            scene = json.loads(msg.payload.decode())
+            scene["received_at"] = time.time()
+            scenes.put(scene)
+        except Exception as e:
+            print("MQTT Message Error:", e)
+
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    client.connect_async(MQTT_BROKER, MQTT_PORT)
+    client.loop_start()
+
+    # === MAIN LOOP ===
+    pending = None  # (scene, surface) rendered and waiting for its flip time
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+
+        while not scenes.empty():
+            renderer.submit(scenes.get_nowait())
+
+        finished = renderer.poll()
+        if finished is not None:
+            pending = finished
+            scene = pending[0]
+            late_by = time.time() - scene["flip_at"]
+            # A retained scene replayed after a (re)connect is already past its flip: show it, don't report it
+            if scene["received_at"] < scene["flip_at"]:
+                client.publish(MQTT_TOPIC_READY, json.dumps({
+                    "tile": args.name, "scene_id": scene["scene_id"],
+                    "late": late_by > 0, "late_by": max(0.0, late_by),
+                }), qos=1)
+
+        if pending is not None and time.time() >= pending[0]["flip_at"]:
+            scene, surface = pending
+            # Fade progress follows the wall clock from flip_at, so a slower panel drops frames instead of lagging
+            transitions.start(surface, started_at=scene["flip_at"],
+                              duration=scene.get("transition_duration", 1.0))
+            pending = None
+        transitions.step()
+
+        if pending is not None:
+            # Sleep exactly until the flip instead of up to a whole idle frame
+            delay = pending[0]["flip_at"] - time.time()
+            if 0 < delay < 1.0 / IDLE_FPS:
+                time.sleep(delay)
+                continue
+        clock.tick(TRANSITION_FPS if transitions.active else IDLE_FPS)
+
+    client.loop_stop()
+    client.disconnect()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Vectorized feature pipeline for the rating model.
+# Ratings are joined to the visual that produced them with a single merge_asof
+# instead of one query per rating, and context features are computed on whole
+# columns: cyclic hour of day, rolling motion rate and a per-user bias obtained
+# by smoothed target encoding (fitted on training rows only, and out-of-fold for
+# the training rows themselves, so no rating contributes to its own feature).
+
+# Import necessary libraries
+import numpy as np  # For vectorized feature computation
+import pandas as pd  # For data manipulation
+
+
+# === Feature Sets ===
+SENSOR_FEATURES = ['light', 'temperature', 'humidity']
+TIME_FEATURES = ['hour_sin', 'hour_cos']
+MOTION_FEATURES = ['motion_rate']
+USER_FEATURES = ['user_bias']
+FEATURE_SETS = {
+    'sensor': SENSOR_FEATURES,
+    'sensor+time': SENSOR_FEATURES + TIME_FEATURES,
+    'sensor+time+motion': SENSOR_FEATURES + TIME_FEATURES + MOTION_FEATURES,
+    'all': SENSOR_FEATURES + TIME_FEATURES + MOTION_FEATURES + USER_FEATURES,
+}
+
+MATCH_TOLERANCE = pd.Timedelta(seconds=5)  # Max distance between a rating's visual_time and its visual
+MOTION_WINDOW = pd.Timedelta(minutes=10)  # Window for the rolling motion rate
+USER_SMOOTHING = 5.0  # Pseudo-count pulling sparse users toward the global mean
+USER_BIAS_FOLDS = 5  # Folds for the out-of-fold user encoding of training rows
+
+
+# === Join ===
+def match_ratings(ratings, visuals, tolerance=MATCH_TOLERANCE):
+    # Join each rating to the nearest visual (sensor_data entry) within the tolerance
+    ratings = pd.DataFrame(ratings)
+    visuals = pd.DataFrame(visuals)
+    if ratings.empty or visuals.empty or 'visual_time' not in ratings:
+        return pd.DataFrame()
+    ratings['visual_ts'] = pd.to_datetime(ratings['visual_time'], utc=True, errors='coerce').dt.as_unit('ns')
+    ratings = ratings.dropna(subset=['visual_ts']).sort_values('visual_ts')
+    visuals['visual_ts'] = pd.to_datetime(visuals['time'], utc=True).dt.as_unit('ns')
+    visuals = visuals.sort_values('visual_ts')[['visual_ts'] + [f for f in SENSOR_FEATURES if f in visuals]]
+    df = pd.merge_asof(ratings[['visual_ts', 'user_id', 'rating']], visuals, on='visual_ts',
+                       direction='nearest', tolerance=tolerance)
+    return df.dropna(subset=[f for f in SENSOR_FEATURES if f in df]).reset_index(drop=True)
+
+
+# === Context Features ===
+def _epoch_ns(times):
+    # Datetime series -> int64 nanoseconds, independent of the parsed resolution
+    return times.dt.as_unit('ns').astype('int64').to_numpy()
+
+
+def add_time_features(df):
+    # Cyclic hour-of-day so 23:00 and 00:00 are neighbours
+    hours = df['visual_ts'].dt.hour + df['visual_ts'].dt.minute / 60.0
+    angle = 2 * np.pi * hours / 24.0
+    df['hour_sin'] = np.sin(angle)
+    df['hour_cos'] = np.cos(angle)
+    return df
+
+
+def add_motion_rate(df, visuals, window=MOTION_WINDOW):
+    # Motion events per minute in the window before each visual (sensor_data rows are motion events)
+    motion_ns = np.sort(_epoch_ns(pd.to_datetime(pd.DataFrame(visuals)['time'], utc=True)))
+    t = _epoch_ns(df['visual_ts'])
+    counts = np.searchsorted(motion_ns, t, side='right') - np.searchsorted(motion_ns, t - window.value, side='left')
+    df['motion_rate'] = counts / (window.total_seconds() / 60.0)
+    return df
+
+
+def fit_user_bias(train, smoothing=USER_SMOOTHING):
+    # Smoothed per-user offset from the global mean rating: (sum - n * mean) / (n + smoothing)
+    global_mean = train['rating'].mean()
+    stats = train.groupby('user_id')['rating'].agg(['sum', 'count'])
+    bias = (stats['sum'] - stats['count'] * global_mean) / (stats['count'] + smoothing)
+    return bias, global_mean
+
+
+def apply_user_bias(df, bias):
+    # Unknown users get no offset
+    df['user_bias'] = df['user_id'].map(bias).fillna(0.0).astype(float)
+    return df
+
+
+def apply_oof_user_bias(df, n_folds=USER_BIAS_FOLDS, smoothing=USER_SMOOTHING, seed=42):
+    # Encode training rows out-of-fold: each row's bias is fitted on the other folds only
+    folds = np.random.default_rng(seed).permutation(len(df)) % n_folds
+    encoded = np.zeros(len(df))
+    for k in range(n_folds):
+        mask = folds == k
+        if mask.any():
+            bias, _ = fit_user_bias(df[~mask], smoothing)
+            encoded[mask] = df['user_id'][mask].map(bias).fillna(0.0).to_numpy(dtype=float)
+    df['user_bias'] = encoded
+    return df
+
+
+def build_features(ratings, visuals):
+    # Full pipeline up to (but not including) the user bias, which depends on the training split
+    df = match_ratings(ratings, visuals)
+    if df.empty:
+        return df
+    df['user_id'] = df['user_id'].astype(str)
+    df['rating'] = df['rating'].astype(float)
+    df = add_time_features(df)
+    return add_motion_rate(df, visuals)
@@ -1,88 +1,127 @@
-
 # Import necessary libraries
-import pandas as pd  # For data manipulation
-from influxdb import InfluxDBClient  # For connecting to InfluxDB
+import os  # For locating the shared storage package
+import sys  # For importing the shared storage package
+import time  # For timing training runs
+import numpy as np  # For error metrics
 from sklearn.ensemble import RandomForestRegressor  # For training the model
+from sklearn.model_selection import TimeSeriesSplit  # For time-ordered cross-validation
+from sklearn.metrics import mean_absolute_error  # For held-out error
 import joblib  # For saving/loading the trained model
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Repository root
+from storage import open_storage  # Shared InfluxDB / embedded time-series storage
+from rating_features import (  # Vectorized feature pipeline
+    FEATURE_SETS, SENSOR_FEATURES, USER_FEATURES, build_features, fit_user_bias, apply_user_bias,
+    apply_oof_user_bias
+)
 
 
 # === Configuration ===
-# InfluxDB connection details
-INFLUX_HOST = "localhost"
-INFLUX_PORT = 8086
-INFLUX_DB = "smartart"
-# Path to save the trained model
+# Storage backend and InfluxDB location come from SMARTART_STORAGE / INFLUX_* (see storage/__init__.py)
+# Path to save the trained model (sensor features only, loaded by the art generators)
 MODEL_PATH = "best_rating_model.pkl"
-
-
-# === Connect to InfluxDB ===
-# Create a client to interact with the database
-client = InfluxDBClient(host=INFLUX_HOST, port=INFLUX_PORT, database=INFLUX_DB)
-
-
-# === Extract Ratings ===
-# Fetch all rating entries from the 'visual_ratings' measurement
-print("Fetching ratings from InfluxDB...")
-ratings = list(client.query('SELECT * FROM visual_ratings').get_points())
-
-
-# === Match Ratings to Sensor Data ===
-# For each rating, find the closest sensor data entry within ±5 seconds
-sensor_rows = []  # List to store matched sensor-rating pairs
-window_ns = 5 * 1_000_000_000  # 5 seconds in nanoseconds
-for r in ratings:
-    visual_time = r.get('visual_time')  # ISO8601 timestamp from rating
-    if not visual_time:
-        continue  # Skip if missing
-    try:
-        # Convert visual_time to nanoseconds for InfluxDB time comparison
-        vt_ns = int(pd.to_datetime(visual_time).value)
-    except Exception as e:
-        print(f"Could not parse visual_time {visual_time}: {e}")
-        continue
-    # Query sensor_data for entries within ±5 seconds of visual_time
-    query = (
-        f"SELECT * FROM sensor_data WHERE time >= {vt_ns - window_ns} AND time <= {vt_ns + window_ns} LIMIT 1"
-    )
-    sensor = list(client.query(query).get_points())
-    if sensor:
-        # Merge sensor data and rating into one row
-        row = {**sensor[0], 'rating': r['rating']}
-        sensor_rows.append(row)
-
-
-# === Check for Matches ===
-if not sensor_rows:
-    print("No matched sensor-rating pairs found.")
-    exit(1)
-
-
-# === Build DataFrame ===
-# Convert matched rows to a pandas DataFrame for analysis/modeling
-df = pd.DataFrame(sensor_rows)
-print(f"Extracted {len(df)} samples.")
-
-
-# === Prepare Data for Model Training ===
-# Select sensor features and target variable (rating)
-features = ['light', 'temperature', 'humidity']
-X = df[features]  # Feature matrix
-y = df['rating']  # Target vector
-
-
-# === Train the AI Model ===
-print("Training RandomForestRegressor...")
-# Create and train a random forest regressor to predict rating from sensor values
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X, y)
-
-# Print feature importances to understand which sensors matter most
-print("Feature importances:")
-for f, imp in zip(features, model.feature_importances_):
-    print(f"  {f}: {imp:.3f}")
-
-
-# === Save the Trained Model ===
-# Persist the model to disk for later use in art generation
-joblib.dump(model, MODEL_PATH)
-print(f"Model saved to {MODEL_PATH}")
+# Path to save the best context-aware model with its feature list and user encoding
+CONTEXT_MODEL_PATH = "context_rating_model.pkl"
+N_SPLITS = 5  # Time-based cross-validation folds
+N_JOBS = -1  # Use all cores for the forest
+
+
+def make_model():
+    # Create a random forest regressor to predict rating from the features
+    return RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=N_JOBS)
+
+
+def prepare_split(train, test, features):
+    # Fit the user encoding on the training rows only (out-of-fold for the rows themselves), then select features
+    if any(f in USER_FEATURES for f in features):
+        bias, _ = fit_user_bias(train)
+        train = apply_oof_user_bias(train.copy())
+        test = apply_user_bias(test.copy(), bias)
+    return train[features], test[features]
+
+
+def evaluate_feature_set(df, features, n_splits=N_SPLITS):
+    # Time-ordered CV: every fold trains on the past and is scored on the following ratings
+    splits = TimeSeriesSplit(n_splits=min(n_splits, len(df) - 1))
+    maes, fit_times = [], []
+    for train_idx, test_idx in splits.split(df):
+        train, test = df.iloc[train_idx], df.iloc[test_idx]
+        X_train, X_test = prepare_split(train, test, features)
+        model = make_model()
+        start = time.perf_counter()
+        model.fit(X_train, train['rating'])
+        fit_times.append(time.perf_counter() - start)
+        maes.append(mean_absolute_error(test['rating'], model.predict(X_test)))
+    return {'mae': float(np.mean(maes)), 'mae_std': float(np.std(maes)), 'fit_time_s': float(np.mean(fit_times))}
+
+
+def fit_final(df, features):
+    # Train on every rating and return the model plus what is needed to rebuild its inputs
+    # (the stored bias is fitted on all ratings, for encoding new ones at inference time)
+    bias, global_mean = fit_user_bias(df)
+    if any(f in USER_FEATURES for f in features):
+        df = apply_oof_user_bias(df.copy())
+    model = make_model()
+    model.fit(df[features], df['rating'])
+    return model, {'features': features, 'user_bias': bias.to_dict(), 'global_mean': float(global_mean)}
+
+
+def main():
+    # === Connect to Storage ===
+    # Create a client to interact with the database
+    storage = open_storage()
+
+    # === Extract Ratings and Visuals ===
+    # Two bulk queries; ratings are matched to visuals in memory
+    print("Fetching ratings and visuals from storage...")
+    start = time.perf_counter()
+    ratings = storage.query('visual_ratings')
+    visuals = storage.query('sensor_data')
+    print(f"Fetched {len(ratings)} ratings and {len(visuals)} visuals in {time.perf_counter() - start:.2f}s")
+
+    # === Build Features ===
+    start = time.perf_counter()
+    df = build_features(ratings, visuals)
+    if df.empty:
+        print("No matched sensor-rating pairs found.")
+        exit(1)
+    df = df.sort_values('visual_ts').reset_index(drop=True)  # Time order for the CV splits
+    print(f"Extracted {len(df)} samples from {df['user_id'].nunique()} users "
+          f"in {time.perf_counter() - start:.3f}s.")
+
+    # === Compare Feature Sets ===
+    results = {}
+    if len(df) > N_SPLITS:
+        print(f"Evaluating feature sets with {N_SPLITS}-fold time-based CV...")
+        for name, features in FEATURE_SETS.items():
+            results[name] = evaluate_feature_set(df, features)
+            r = results[name]
+            print(f"  {name:<20} MAE={r['mae']:.3f} (±{r['mae_std']:.3f})  fit={r['fit_time_s']:.3f}s")
+        best_name = min(results, key=lambda n: results[n]['mae'])
+    else:
+        print("Not enough samples for cross-validation, training on sensor features only.")
+        best_name = 'sensor'
+
+    # === Train the AI Model ===
+    print("Training RandomForestRegressor...")
+    start = time.perf_counter()
+    model, _ = fit_final(df, SENSOR_FEATURES)
+    print(f"Trained sensor model in {time.perf_counter() - start:.2f}s")
+
+    # Print feature importances to understand which sensors matter most
+    print("Feature importances:")
+    for f, imp in zip(SENSOR_FEATURES, model.feature_importances_):
+        print(f"  {f}: {imp:.3f}")
+
+    # === Save the Trained Models ===
+    # The art generators control only sensor values, so they keep loading the sensor-only model
+    joblib.dump(model, MODEL_PATH)
+    print(f"Model saved to {MODEL_PATH}")
+
+    context_model, meta = fit_final(df, FEATURE_SETS[best_name])
+    meta.update({'feature_set': best_name, 'cv': results})
+    joblib.dump({'model': context_model, **meta}, CONTEXT_MODEL_PATH)
+    print(f"Best feature set '{best_name}' saved to {CONTEXT_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
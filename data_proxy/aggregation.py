@@ -0,0 +1,117 @@
+# Edge aggregation for sensor readings before they reach InfluxDB.
+# - Deadband: a reading is only written when a field moved more than its deadband
+#   from the last written value (fields without a deadband must match exactly).
+# - Time window: readings are folded into mean/min/max over window_s seconds and
+#   written once per window (mean keeps the original field name, so existing
+#   queries and the forecaster keep working; <field>_min/<field>_max/samples are added).
+# - Heartbeat: a point is written at least every heartbeat_s seconds even if nothing changed.
+# - Motion debounce: motion triggers closer than motion_debounce_s are ignored.
+
+# Import required libraries
+import time  # For window and debounce timing
+
+DEFAULT_DEADBANDS = {"light": 20.0, "temperature": 0.5, "humidity": 1.0}  # Raw ADC, °C, %
+
+
+def parse_deadbands(text):
+    # Parse "light=20,temperature=0.5" into a dict (empty string -> defaults)
+    if not text:
+        return dict(DEFAULT_DEADBANDS)
+    deadbands = {}
+    for item in text.split(","):
+        key, _, value = item.partition("=")
+        deadbands[key.strip()] = float(value)
+    return deadbands
+
+
+class SensorAggregator:
+    def __init__(self, deadbands=None, window_s=0.0, heartbeat_s=60.0, motion_debounce_s=5.0,
+                 clock=time.monotonic):
+        self.deadbands = DEFAULT_DEADBANDS if deadbands is None else deadbands
+        self.window_s = window_s  # 0 disables windowing
+        self.heartbeat_s = heartbeat_s  # 0 disables the heartbeat
+        self.motion_debounce_s = motion_debounce_s  # 0 disables debouncing
+        self.clock = clock
+        self.last_written = None  # Last point written to InfluxDB
+        self.last_write_time = None
+        self.last_motion_time = None
+        self._reset_window(None)
+
+    # --- Sensor readings ---
+    def add_reading(self, payload, now=None):
+        # Feed one reading; returns the point to write, or None if it was absorbed
+        now = self.clock() if now is None else now
+        if not self.window_s:
+            return self._emit(payload, now)
+
+        point = None
+        if self.window_start is not None and now - self.window_start >= self.window_s:
+            point = self.flush(now)  # Close the previous window first
+        if self.window_start is None:
+            self.window_start = now
+        for key, value in payload.items():
+            if key in self.deadbands and isinstance(value, (int, float)):
+                self.sums[key] = self.sums.get(key, 0.0) + value
+                self.mins[key] = min(self.mins.get(key, value), value)
+                self.maxs[key] = max(self.maxs.get(key, value), value)
+                self.counts[key] = self.counts.get(key, 0) + 1
+            else:
+                self.extra[key] = value  # Non-aggregated fields keep their latest value
+        return point
+
+    def flush(self, now=None):
+        # Close the current window; returns its aggregated point unless it was filtered out
+        now = self.clock() if now is None else now
+        if self.window_start is None:
+            return None
+        point = dict(self.extra)
+        for key, total in self.sums.items():
+            n = self.counts[key]
+            point[key] = total / n
+            point[f"{key}_min"] = self.mins[key]
+            point[f"{key}_max"] = self.maxs[key]
+        point["samples"] = max(self.counts.values(), default=0)
+        self._reset_window(None)
+        return self._emit(point, now)
+
+    def _reset_window(self, start):
+        self.window_start = start
+        self.sums, self.mins, self.maxs, self.counts, self.extra = {}, {}, {}, {}, {}
+
+    def _emit(self, point, now):
+        if self._changed(point) or self._heartbeat_due(now):
+            self.last_written = dict(point)
+            self.last_write_time = now
+            return point
+        return None
+
+    def _changed(self, point):
+        # True if any field moved beyond its deadband (or changed at all without one)
+        last = self.last_written
+        if last is None:
+            return True
+        for key, value in point.items():
+            if key not in last:
+                return True
+            band = self.deadbands.get(key)
+            if band is not None and isinstance(value, (int, float)) and isinstance(last[key], (int, float)):
+                if abs(value - last[key]) > band:
+                    return True
+            elif key in ("samples",) or key.endswith(("_min", "_max")):
+                continue  # Window statistics alone never force a write
+            elif value != last[key]:
+                return True
+        return False
+
+    def _heartbeat_due(self, now):
+        return bool(self.heartbeat_s) and (self.last_write_time is None or now - self.last_write_time >= self.heartbeat_s)
+
+    # --- Motion ---
+    def accept_motion(self, now=None):
+        # True if this motion trigger should produce a sensor_data entry
+        now = self.clock() if now is None else now
+        if (self.motion_debounce_s and self.last_motion_time is not None
+                and now - self.last_motion_time < self.motion_debounce_s):
+            return False
+        self.last_motion_time = now
+        return True
@@ -1,25 +1,66 @@
-
 # Import required libraries
+import os  # For environment configuration
+import sys  # For importing the shared storage package
 import json  # For JSON handling
-import threading  # For running Flask in a separate thread
-from flask import Flask, request, jsonify  # For API endpoints
+import time  # For write latency and batching intervals
+import queue  # For handing points from MQTT callbacks to the writer thread
+import logging  # For level-controlled structured logging
+import threading  # For running Flask and the InfluxDB writer in separate threads
+from flask import Flask, request, jsonify, Response  # For API endpoints
 import paho.mqtt.client as mqtt  # For MQTT communication
-from influxdb import InfluxDBClient  # For connecting to InfluxDB
+from metrics import MetricsRegistry  # In-process metrics exposed on /metrics
+from aggregation import SensorAggregator, parse_deadbands  # Deadband / window / debounce before writes
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Repository root
+from storage import open_storage  # Shared InfluxDB / embedded time-series storage
 
 
 # === Configuration ===
-INFLUX_HOST = "localhost"  # InfluxDB host
-INFLUX_PORT = 8086         # InfluxDB port
-INFLUX_DB = "smartart"    # InfluxDB database name
-
+# Storage backend and InfluxDB location come from SMARTART_STORAGE / INFLUX_* (see storage/__init__.py)
 MQTT_BROKER = "localhost"  # MQTT broker host
 MQTT_PORT = 1883            # MQTT broker port
 TOPIC_SENSOR = "smartart/sensor"  # MQTT topic for sensor data
 TOPIC_MOTION = "smartart/motion"  # MQTT topic for motion data
+TOPIC_VISUAL = "smartart/visual"  # Accepted (debounced) motion triggers, one per sensor_data entry
+
+LOG_LEVEL = os.getenv("PROXY_LOG_LEVEL", "INFO").upper()  # DEBUG logs every message and write
+WRITE_BATCH_SIZE = int(os.getenv("PROXY_WRITE_BATCH", "100"))  # Max points per InfluxDB write
+WRITE_FLUSH_INTERVAL = float(os.getenv("PROXY_WRITE_INTERVAL", "1.0"))  # Max seconds a point waits in the queue
+WRITE_QUEUE_MAX = 10000  # Points buffered before new ones are dropped
+
+# Edge aggregation (see aggregation.py); set PROXY_DEADBANDS to e.g. "light=0,temperature=0,humidity=0" to write everything
+DEADBANDS = parse_deadbands(os.getenv("PROXY_DEADBANDS", ""))  # Per-field change needed to write a reading
+AGG_WINDOW = float(os.getenv("PROXY_AGG_WINDOW", "0"))  # Seconds of mean/min/max aggregation (0 = off)
+HEARTBEAT = float(os.getenv("PROXY_HEARTBEAT", "60"))  # Write at least this often even when unchanged
+MOTION_DEBOUNCE = float(os.getenv("PROXY_MOTION_DEBOUNCE", "5"))  # Ignore motion triggers closer than this
+
+
+# === Logging ===
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=getattr(logging, LOG_LEVEL, logging.INFO)
+)
+logger = logging.getLogger("data_proxy")
+
+
+# === Metrics ===
+metrics = MetricsRegistry()
+metrics.describe("mqtt_messages_total", "counter", "MQTT messages received per topic")
+metrics.describe("mqtt_messages_per_second", "gauge", "MQTT messages per second per topic (60 s window)")
+metrics.describe("decode_errors_total", "counter", "MQTT payloads that failed to decode or process")
+metrics.describe("points_queued_total", "counter", "Points queued for InfluxDB per measurement")
+metrics.describe("points_dropped_total", "counter", "Points dropped because the write queue was full")
+metrics.describe("write_errors_total", "counter", "Failed storage batch writes")
+metrics.describe("write_batch_size", "histogram", "Points per InfluxDB write",
+                 buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+metrics.describe("write_latency_seconds", "histogram", "InfluxDB write latency")
+metrics.describe("write_queue_depth", "gauge", "Points waiting to be written")
+metrics.describe("http_requests_total", "counter", "HTTP ingest requests per endpoint")
+metrics.describe("readings_suppressed_total", "counter", "Sensor readings absorbed by deadband/window aggregation")
+metrics.describe("motion_debounced_total", "counter", "Motion triggers ignored by the debounce")
 
 
 # === Initialize Clients ===
-influx_client = InfluxDBClient(host=INFLUX_HOST, port=INFLUX_PORT, database=INFLUX_DB)  # Connect to InfluxDB
+storage = open_storage()  # Connect to the configured time-series store
 mqtt_client = mqtt.Client()  # Create MQTT client
 
 
@@ -28,81 +69,151 @@ app = Flask(__name__)  # Create Flask app
 
 
 # === Unified Write Function ===
+write_queue = queue.Queue(maxsize=WRITE_QUEUE_MAX)  # Points waiting for the writer thread
+metrics.set("write_queue_depth", write_queue.qsize)  # Evaluated at scrape time
+
+_last_point_ns = 0  # Last timestamp handed out, so points never share one
+_point_time_lock = threading.Lock()
+
+def point_time_ns():
+    # Strictly increasing receive time in ns: a batch written without times would get one server
+    # timestamp in InfluxDB, and points with the same tags would overwrite each other
+    global _last_point_ns
+    with _point_time_lock:
+        _last_point_ns = max(time.time_ns(), _last_point_ns + 1)
+        return _last_point_ns
+
 def write_to_influx(measurement, data):
-    # Write a data point to InfluxDB
+    # Queue a data point for InfluxDB; the writer thread sends it in a batch
+    point = {
+        "measurement": measurement,  # Measurement name
+        "time": point_time_ns(),  # Stamped when queued, not when the batch is written
+        "tags": {"location": "room1"},  # Example tag
+        "fields": {k: float(v) if isinstance(v, (int, float)) else v
+                   for k, v in data.items()}  # Store fields
+    }
     try:
-        json_body = [{
-            "measurement": measurement,  # Measurement name
-            "tags": {"location": "room1"},  # Example tag
-            "fields": {k: float(v) if isinstance(v, (int, float)) else v
-                       for k, v in data.items()}  # Store fields
-        }]
-        print(f"[InfluxDB] Writing to '{measurement}': {json_body}")  # Log write
-        influx_client.write_points(json_body)  # Write to DB
-    except Exception as e:
-        print(f"[ERROR] Failed to write data: {e}")  # Log error
+        write_queue.put_nowait(point)
+        metrics.inc("points_queued_total", measurement=measurement)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("queued point measurement=%s fields=%s", measurement, point["fields"])
+    except queue.Full:
+        metrics.inc("points_dropped_total", measurement=measurement)
+        logger.warning("write queue full, dropping point for '%s'", measurement)
+
+
+def writer_loop(stop_event):
+    # Drain the queue, writing up to WRITE_BATCH_SIZE points per InfluxDB call
+    while not (stop_event.is_set() and write_queue.empty()):
+        try:
+            batch = [write_queue.get(timeout=WRITE_FLUSH_INTERVAL)]
+        except queue.Empty:
+            continue
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while len(batch) < WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        start = time.perf_counter()
+        try:
+            storage.write_points(batch)  # Write to DB
+            elapsed = time.perf_counter() - start
+            metrics.observe("write_latency_seconds", elapsed)
+            metrics.observe("write_batch_size", len(batch))
+            logger.debug("wrote batch size=%d latency_ms=%.1f", len(batch), elapsed * 1000)
+        except Exception as e:
+            metrics.inc("write_errors_total")
+            logger.error("failed to write batch size=%d: %s", len(batch), e)  # Log error
 
 
 # === MQTT Callbacks ===
 latest_sensor_data = {}  # Buffer for latest sensor data
+aggregator = SensorAggregator(DEADBANDS, AGG_WINDOW, HEARTBEAT, MOTION_DEBOUNCE)
+aggregator_lock = threading.Lock()  # MQTT callbacks and shutdown flush may race
 
 def on_connect(client, userdata, flags, rc):
     # Callback when MQTT connects
-    print(f"[MQTT] Connected (rc={rc})")
+    logger.info("MQTT connected rc=%s", rc)
     client.subscribe([(TOPIC_SENSOR, 0), (TOPIC_MOTION, 0)])  # Subscribe to topics
 
 def on_message(client, userdata, msg):
     # Callback for incoming MQTT messages
     global latest_sensor_data
+    metrics.inc("mqtt_messages_total", topic=msg.topic)
+    metrics.mark("mqtt_messages_per_second", topic=msg.topic)
     try:
         payload = json.loads(msg.payload.decode())  # Decode JSON payload
-        print(f"[MQTT] Received on {msg.topic}: {payload}")  # Log received message
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("received topic=%s payload=%s", msg.topic, payload)  # Log received message
         if msg.topic == TOPIC_SENSOR:
             # Buffer the latest sensor data
             latest_sensor_data = payload
 
-            # Write every sensor reading to 'all_sensor_data' for full-data forecasting
-            write_to_influx("all_sensor_data", payload)
-            
+            # Write significant/aggregated readings to 'all_sensor_data' for forecasting
+            with aggregator_lock:
+                point = aggregator.add_reading(payload)
+            if point is not None:
+                write_to_influx("all_sensor_data", point)
+            else:
+                metrics.inc("readings_suppressed_total")
+
         elif msg.topic == TOPIC_MOTION:
             # Only write a unified entry when motion is detected
             if 'motion' in payload and int(payload['motion']) == 1:
+                with aggregator_lock:
+                    accepted = aggregator.accept_motion()
+                if not accepted:
+                    metrics.inc("motion_debounced_total")
+                    return
                 unified_data = latest_sensor_data.copy() if latest_sensor_data else {}
                 unified_data['motion'] = 1  # Set motion to 1
                 write_to_influx("sensor_data", unified_data)  # Write unified entry
+                client.publish(TOPIC_VISUAL, json.dumps(unified_data))  # Renderers redraw on this, so every visual has its entry
     except Exception as e:
-        print(f"[ERROR] Message handling failed: {e}")  # Log error
+        metrics.inc("decode_errors_total", topic=msg.topic)
+        logger.warning("message handling failed topic=%s: %s", msg.topic, e)  # Log error
 
 
 # === HTTP routes ===
 @app.route('/sensor', methods=['POST'])
 def sensor_data():
     # HTTP endpoint to receive sensor data
+    metrics.inc("http_requests_total", endpoint="sensor")
     data = request.json  # Get JSON body
     if not data:
         return jsonify({"error": "No JSON body"}), 400  # Error if missing
     try:
         mqtt_client.publish(TOPIC_SENSOR, json.dumps(data))  # Publish to MQTT
-        print(f"[HTTP] Received sensor data: {data} -> published to MQTT")  # Log
+        logger.debug("HTTP sensor data %s -> published to MQTT", data)  # Log
         return jsonify({"status": "success"}), 200  # Success response
     except Exception as e:
-        print(f"[ERROR] MQTT publish failed: {e}")  # Log error
+        logger.error("MQTT publish failed: %s", e)  # Log error
         return jsonify({"error": str(e)}), 500  # Error response
 
 @app.route('/motion', methods=['POST'])
 def motion_data():
     # HTTP endpoint to receive motion data
+    metrics.inc("http_requests_total", endpoint="motion")
     data = request.json  # Get JSON body
     if not data:
         return jsonify({"error": "No JSON body"}), 400  # Error if missing
     try:
         mqtt_client.publish(TOPIC_MOTION, json.dumps(data))  # Publish to MQTT
-        print(f"[HTTP] Received motion data: {data} -> published to MQTT")  # Log
+        logger.debug("HTTP motion data %s -> published to MQTT", data)  # Log
         return jsonify({"status": "success"}), 200  # Success response
     except Exception as e:
-        print(f"[ERROR] MQTT publish failed: {e}")  # Log error
+        logger.error("MQTT publish failed: %s", e)  # Log error
         return jsonify({"error": str(e)}), 500  # Error response
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Prometheus-format metrics for the proxy's hot paths
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 
 # === Run Flask in a thread ===
 def run_flask():
@@ -115,25 +226,33 @@ if __name__ == "__main__":
     mqtt_client.on_connect = on_connect  # Set MQTT connect callback
     mqtt_client.on_message = on_message  # Set MQTT message callback
 
+    writer_stop = threading.Event()
+    writer_thread = threading.Thread(target=writer_loop, args=(writer_stop,), daemon=True)
     try:
-        influx_client.create_database(INFLUX_DB)  # Create DB if not exists
+        storage.create_database()  # Create DB if not exists
+        writer_thread.start()  # Start batching InfluxDB writer
         mqtt_client.connect(MQTT_BROKER, MQTT_PORT)  # Connect to MQTT broker
-        print("[System] MQTT connected, starting HTTP server...")
+        logger.info("MQTT connected, starting HTTP server...")
 
         # Start Flask HTTP server in a thread
         flask_thread = threading.Thread(target=run_flask)
         flask_thread.daemon = True  # Daemon thread
         flask_thread.start()
 
-        print("[System] Ready. Listening for HTTP POST and MQTT messages...")
+        logger.info("Ready. Listening for HTTP POST and MQTT messages (metrics on /metrics)...")
         mqtt_client.loop_forever()  # Start MQTT loop
 
     except KeyboardInterrupt:
-        print("\n[System] Shutting down...")  # Handle Ctrl+C
+        logger.info("Shutting down...")  # Handle Ctrl+C
     finally:
         mqtt_client.disconnect()  # Disconnect MQTT
-        influx_client.close()     # Close InfluxDB
-        print("[System] Shutdown complete.")
-        flask_thread.join()      # Wait for Flask thread
-        print("[System] Flask server stopped.")
-        exit(0)
\ No newline at end of file
+        with aggregator_lock:
+            point = aggregator.flush()  # Do not lose a partially filled window
+        if point is not None:
+            write_to_influx("all_sensor_data", point)
+        writer_stop.set()  # Let the writer flush what is still queued
+        if writer_thread.is_alive():
+            writer_thread.join(timeout=10)
+        storage.close()     # Close storage
+        logger.info("Shutdown complete.")  # Flask runs in a daemon thread and stops with the process
+        exit(0)
@@ -0,0 +1,118 @@
+# Minimal in-process metrics registry for the data proxy.
+# Counters, gauges, histograms and sliding-window rates are updated from the hot
+# path with a single lock acquisition and rendered in the Prometheus text format
+# by the /metrics endpoint, so no extra dependency is needed.
+
+# Import required libraries
+import time  # For rate windows
+import threading  # For thread-safe updates from MQTT, writer and Flask threads
+from collections import deque  # For sliding-window rate tracking
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)  # Seconds
+
+
+def _label_str(labels):
+    # Render a sorted label tuple as {k="v",...}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self, prefix="smartart_proxy_", rate_window=60.0):
+        self.prefix = prefix
+        self.rate_window = rate_window  # Seconds used for the *_per_second gauges
+        self.lock = threading.Lock()
+        self.help = {}  # name -> (type, help text)
+        self.counters = {}  # (name, labels) -> value
+        self.gauges = {}  # (name, labels) -> value or callable
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.buckets = {}  # name -> bucket bounds
+        self.rates = {}  # (name, labels) -> deque of event timestamps
+
+    def describe(self, name, kind, text, buckets=None):
+        # Register the type/help of a metric (and buckets for histograms)
+        self.help[name] = (kind, text)
+        if buckets is not None:
+            self.buckets[name] = tuple(buckets)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        # Set a gauge; `value` may be a callable evaluated at scrape time
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        # Record one histogram observation
+        key = (name, tuple(sorted(labels.items())))
+        bounds = self.buckets.get(name, DEFAULT_BUCKETS)
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [0] * (len(bounds) + 2)
+            for i, b in enumerate(bounds):
+                if value <= b:
+                    h[i] += 1
+                    break
+            h[-2] += value
+            h[-1] += 1
+
+    def mark(self, name, **labels):
+        # Record an event for a sliding-window rate gauge
+        key = (name, tuple(sorted(labels.items())))
+        now = time.monotonic()
+        with self.lock:
+            q = self.rates.get(key)
+            if q is None:
+                q = self.rates[key] = deque()
+            q.append(now)
+            self._trim(q, now)
+
+    def _trim(self, q, now):
+        cutoff = now - self.rate_window
+        while q and q[0] < cutoff:
+            q.popleft()
+
+    def render(self):
+        # Render every metric in the Prometheus text exposition format
+        lines = []
+        now = time.monotonic()
+        with self.lock:
+            emitted = set()
+
+            def header(name, default_kind):
+                if name in emitted:
+                    return
+                emitted.add(name)
+                kind, text = self.help.get(name, (default_kind, name))
+                lines.append(f"# HELP {self.prefix}{name} {text}")
+                lines.append(f"# TYPE {self.prefix}{name} {kind}")
+
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{self.prefix}{name}{_label_str(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items(), key=lambda kv: kv[0]):
+                header(name, "gauge")
+                if callable(value):
+                    value = value()
+                lines.append(f"{self.prefix}{name}{_label_str(labels)} {value}")
+            for (name, labels), q in sorted(self.rates.items(), key=lambda kv: kv[0]):
+                header(name, "gauge")
+                self._trim(q, now)
+                lines.append(f"{self.prefix}{name}{_label_str(labels)} {len(q) / self.rate_window:.3f}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                header(name, "histogram")
+                bounds = self.buckets.get(name, DEFAULT_BUCKETS)
+                cumulative = 0
+                for b, n in zip(bounds, h):
+                    cumulative += n
+                    lines.append(f"{self.prefix}{name}_bucket{_label_str(labels + (('le', b),))} {cumulative}")
+                lines.append(f"{self.prefix}{name}_bucket{_label_str(labels + (('le', '+Inf'),))} {h[-1]}")
+                lines.append(f"{self.prefix}{name}_sum{_label_str(labels)} {h[-2]}")
+                lines.append(f"{self.prefix}{name}_count{_label_str(labels)} {h[-1]}")
+        return "\n".join(lines) + "\n"
@@ -1,19 +1,18 @@
 
 # Import required libraries
+import os  # For locating the shared storage package
+import sys  # For importing the shared storage package
 import json  # For JSON handling
+import time  # For rating timestamps
 from flask import Flask, request, jsonify  # For API endpoints
-from influxdb import InfluxDBClient  # For connecting to InfluxDB
-from datetime import datetime  # For timestamps
+from datetime import datetime, timezone  # For timestamps
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Repository root
+from storage import open_storage  # Shared InfluxDB / embedded time-series storage
 
 
-# === Configuration ===
-INFLUX_HOST = "localhost"  # InfluxDB host
-INFLUX_PORT = 8086         # InfluxDB port
-INFLUX_DB = "smartart"    # InfluxDB database name
-
-
-# === Initialize Client ===
-influx_client = InfluxDBClient(host=INFLUX_HOST, port=INFLUX_PORT, database=INFLUX_DB)  # Connect to InfluxDB
+# === Initialize Storage ===
+# Backend and InfluxDB location come from SMARTART_STORAGE / INFLUX_* (see storage/__init__.py)
+storage = open_storage()  # Connect to the configured time-series store
 app = Flask(__name__)  # Create Flask app
 
 
@@ -21,42 +20,76 @@ app = Flask(__name__)  # Create Flask app
 @app.route('/latest_visual', methods=['GET'])
 def latest_visual():
     # Query InfluxDB for the latest sensor entry where motion == 1, in sensor_data only measurements that generated a visual are stored 
-    query = 'SELECT * FROM sensor_data ORDER BY time DESC LIMIT 1'
-    result = influx_client.query(query)  # Execute query
-    points = list(result.get_points())  # Get results as list
-    if points:
-        return jsonify(points[0]), 200  # Return latest visual as JSON
+    point = storage.latest('sensor_data')  # Most recent unified entry
+    if point:
+        return jsonify(point), 200  # Return latest visual as JSON
     else:
         return jsonify({'error': 'No visual found'}), 404  # Return error if not found
 
 
+# === Rating Point Helper ===
+REQUIRED_RATING_FIELDS = ['user_id', 'rating', 'visual_time']  # Required fields for a rating
+
+
+def rating_point(data):
+    # Build the InfluxDB entry for a single rating
+    # Buffered ratings carry queued_at (epoch seconds, when the user rated); direct ones are stamped now.
+    # An explicit point time also keeps several ratings of one user in a batch from overwriting each other.
+    rated_at = float(data['queued_at']) if data.get('queued_at') is not None else time.time()
+    rated_at_us = int(round(rated_at * 1_000_000))
+    return {
+        "measurement": "visual_ratings",
+        "time": rated_at_us * 1000,  # Nanoseconds
+        "tags": {
+            "user_id": str(data['user_id'])  # Store user ID as tag
+        },
+        "fields": {
+            "rating": int(data['rating']),  # Store rating value
+            "visual_time": str(data['visual_time']),  # Store visual timestamp
+            "timestamp": datetime.fromtimestamp(rated_at_us / 1_000_000, timezone.utc)
+                                 .replace(tzinfo=None).isoformat() + "Z"  # UTC time of the rating
+        }
+    }
+
+
 # === API: Store Rating ===
 @app.route('/rate_visual', methods=['POST'])
 def rate_visual():
     # Store a rating for a visual in InfluxDB
     data = request.json  # Get JSON payload from request
-    required = ['user_id', 'rating', 'visual_time']  # Required fields
-    if not all(k in data for k in required):
+    if not all(k in data for k in REQUIRED_RATING_FIELDS):
         return jsonify({'error': 'Missing fields'}), 400  # Error if missing fields
     try:
-        # Prepare InfluxDB entry
-        json_body = [{
-            "measurement": "visual_ratings",
-            "tags": {
-                "user_id": str(data['user_id'])  # Store user ID as tag
-            },
-            "fields": {
-                "rating": int(data['rating']),  # Store rating value
-                "visual_time": str(data['visual_time']),  # Store visual timestamp
-                "timestamp": datetime.utcnow().isoformat() + "Z"  # Store current UTC timestamp
-            }
-        }]
-        influx_client.write_points(json_body)  # Write to InfluxDB
+        storage.write_points([rating_point(data)])  # Write to storage
         return jsonify({'status': 'success'}), 200  # Success response
     except Exception as e:
         return jsonify({'error': str(e)}), 500  # Error response
 
 
+# === API: Store Ratings in Batch ===
+@app.route('/rate_visuals', methods=['POST'])
+def rate_visuals():
+    # Store a batch of ratings with a single InfluxDB write (used by the bot's local buffer)
+    data = request.json or {}  # Get JSON payload from request
+    ratings = data.get('ratings')
+    if not isinstance(ratings, list):
+        return jsonify({'error': 'Expected a "ratings" list'}), 400  # Error if malformed
+    points, rejected = [], 0
+    for r in ratings:
+        try:
+            if not all(k in r for k in REQUIRED_RATING_FIELDS):
+                raise ValueError("missing fields")
+            points.append(rating_point(r))
+        except (TypeError, ValueError):
+            rejected += 1  # Skip invalid entries so they do not block the rest of the batch
+    try:
+        if points:
+            storage.write_points(points)  # One write for the whole batch
+        return jsonify({'status': 'success', 'stored': len(points), 'rejected': rejected}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500  # Error response, the client keeps the batch and retries
+
+
 # === Main Entrypoint ===
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5050, threaded=True)  # Run Flask app on port 5050
@@ -0,0 +1,226 @@
+# Offline benchmark for the forecasting pipeline.
+# Generates synthetic sensor series (diurnal cycle + noise + gaps + bursts),
+# runs the same resample/ARIMA/evaluate steps as forecast_data.py without InfluxDB,
+# and writes fit time, peak memory and error per field, order and horizon as JSON.
+
+# Import required libraries
+import argparse  # For command line options
+import json  # For writing the JSON report
+import platform  # For recording the host in the report
+import statistics  # For the median fit time
+import time  # For timing model fits
+import tracemalloc  # For measuring peak memory of a fit
+import warnings  # For silencing statsmodels convergence chatter
+import numpy as np  # For synthetic signal generation
+import pandas as pd  # For time-indexed series
+
+# Reuse the exact pipeline used on live data, so the benchmark measures what ships
+from forecast_data import (
+    SENSOR_FIELDS, RESAMPLE_FREQ, MIN_POINTS,
+    prepare_series, fit_and_forecast, evaluate_forecast
+)
+
+
+# === Config ===
+DEFAULT_ORDERS = [(1, 1, 1), (2, 1, 2), (3, 1, 3)]  # ARIMA orders to compare
+DEFAULT_HORIZONS = [12, 60, 180]  # Forecast horizons in resampled steps (1 min, 5 min, 15 min at 5 s)
+DEFAULT_HOURS = 6  # Same window as the live forecast query
+DEFAULT_SEED = 42  # Fixed seed so reports are comparable across runs
+DEFAULT_REPEATS = 5  # Timed fits per case; the fastest is compared, a single fit is too noisy to gate on
+SAMPLE_PERIOD_S = 2  # Raw publish period of the simulated sensor
+
+# Per-field signal shape: (baseline, diurnal amplitude, noise std, burst amplitude, min, max)
+SIGNAL_PROFILES = {
+    'temperature': (22.0, 3.0, 0.2, 4.0, -10.0, 50.0),
+    'humidity': (50.0, 8.0, 1.0, 15.0, 0.0, 100.0),
+    'light': (400.0, 300.0, 20.0, 400.0, 0.0, 1023.0),
+}
+
+# Regression thresholds used when comparing against a baseline report
+TIME_TOLERANCE = 0.25   # Fit time may grow by at most 25%
+ERROR_TOLERANCE = 0.05  # MAE may grow by at most 5%
+
+
+# === Synthetic Data ===
+def generate_synthetic_series(field, hours=DEFAULT_HOURS, seed=DEFAULT_SEED,
+                              gap_ratio=0.05, burst_count=3):
+    # Build a raw, irregular sensor series for one field
+    base, amp, noise_std, burst_amp, lo, hi = SIGNAL_PROFILES[field]
+    rng = np.random.default_rng(seed)
+
+    n = int(hours * 3600 / SAMPLE_PERIOD_S)
+    t = np.arange(n) * SAMPLE_PERIOD_S  # Seconds since start
+    # Diurnal cycle (24 h period) plus a slower drift and white noise
+    values = base + amp * np.sin(2 * np.pi * t / 86400.0)
+    values += 0.1 * amp * np.sin(2 * np.pi * t / 3600.0)
+    values += rng.normal(0, noise_std, n)
+
+    # Bursts: short exponentially decaying spikes (door opened, lamp switched on, ...)
+    for start in rng.integers(0, n, burst_count):
+        length = min(n - start, int(rng.integers(30, 180)))
+        decay = np.exp(-np.arange(length) / (length / 4.0))
+        values[start:start + length] += burst_amp * decay * rng.choice([-1, 1])
+
+    values = np.clip(values, lo, hi)
+
+    # Jitter timestamps to mimic WiFi/MQTT delivery delays
+    jitter = rng.uniform(0, SAMPLE_PERIOD_S * 0.4, n)
+    index = pd.Timestamp('2024-01-01') + pd.to_timedelta(t + jitter, unit='s')
+    series = pd.Series(values, index=index, name=field)
+
+    # Gaps: drop contiguous blocks of samples (sensor offline / broker restart)
+    keep = np.ones(n, dtype=bool)
+    n_gaps = max(1, int(gap_ratio * n / 60))
+    for start in rng.integers(0, n, n_gaps):
+        keep[start:start + 60] = False
+    return series[keep]
+
+
+# === Benchmark ===
+def _fit_quietly(train, steps, order):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # Convergence chatter would flood the report output
+        return fit_and_forecast(train, steps, order=order)
+
+
+def benchmark_case(data, order, horizon, repeats=DEFAULT_REPEATS):
+    # Fit on everything but the last `horizon` points, forecast them and measure the run
+    train, test = data[:-horizon], data[-horizon:]
+    # Timed runs without tracemalloc: its per-allocation hooks would inflate and skew fit_time_s
+    fit_times = []
+    forecast, error = None, None
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        try:
+            forecast = _fit_quietly(train, len(test), order)
+        except Exception as e:
+            forecast, error = None, str(e)
+            break  # Deterministic failure, repeating it tells nothing
+        fit_times.append(time.perf_counter() - start)
+
+    # Separate, untimed run for peak memory
+    peak = 0
+    if error is None:
+        tracemalloc.start()
+        try:
+            _fit_quietly(train, len(test), order)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    result = {
+        'order': list(order),
+        'horizon': horizon,
+        'train_points': len(train),
+        'fit_time_s': round(min(fit_times), 4) if fit_times else None,  # Fastest repeat, used by compare_reports
+        'fit_time_median_s': round(statistics.median(fit_times), 4) if fit_times else None,
+        'repeats': len(fit_times),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    if error is not None:
+        result['error'] = error
+    else:
+        result.update({k: round(v, 4) for k, v in evaluate_forecast(test, forecast).items()})
+    return result
+
+
+def run_benchmark(fields=SENSOR_FIELDS, orders=DEFAULT_ORDERS, horizons=DEFAULT_HORIZONS,
+                  hours=DEFAULT_HOURS, seed=DEFAULT_SEED, repeats=DEFAULT_REPEATS):
+    # Run every (field, order, horizon) combination and collect the results
+    results = []
+    for offset, field in enumerate(fields):
+        raw = generate_synthetic_series(field, hours=hours, seed=seed + offset)
+        prep_start = time.perf_counter()
+        data = prepare_series(raw)
+        prep_time = time.perf_counter() - prep_start
+        print(f"[{field}] {len(raw)} raw points -> {len(data)} resampled ({prep_time * 1000:.1f} ms)")
+        for order in orders:
+            for horizon in horizons:
+                if len(data) - horizon < MIN_POINTS:
+                    print(f"  skipping order={order} horizon={horizon}: not enough data")
+                    continue
+                res = benchmark_case(data, order, horizon, repeats)
+                res['field'] = field
+                results.append(res)
+                print(f"  order={order} horizon={horizon}: "
+                      f"{res['fit_time_s'] or float('nan'):.3f}s (median {res['fit_time_median_s'] or float('nan'):.3f}s), "
+                      f"{res['peak_memory_kb']:.0f} KB, "
+                      f"MAE={res.get('mae', float('nan')):.3f}")
+    return {
+        'config': {
+            'fields': list(fields),
+            'orders': [list(o) for o in orders],
+            'horizons': list(horizons),
+            'hours': hours,
+            'seed': seed,
+            'repeats': repeats,
+            'resample_freq': RESAMPLE_FREQ,
+        },
+        'host': {'python': platform.python_version(), 'machine': platform.machine()},
+        'results': results,
+    }
+
+
+# === Regression Check ===
+def _case_key(res):
+    return (res['field'], tuple(res['order']), res['horizon'])
+
+
+def compare_reports(current, baseline, time_tol=TIME_TOLERANCE, error_tol=ERROR_TOLERANCE):
+    # Return a list of human readable regressions of `current` against `baseline`
+    base = {_case_key(r): r for r in baseline['results']}
+    regressions = []
+    for res in current['results']:
+        old = base.get(_case_key(res))
+        if old is None:
+            continue
+        label = f"{res['field']} order={tuple(res['order'])} horizon={res['horizon']}"
+        if 'error' in res and 'error' not in old:
+            regressions.append(f"{label}: fit now fails ({res['error']})")
+            continue
+        if res['fit_time_s'] and old.get('fit_time_s') and res['fit_time_s'] > old['fit_time_s'] * (1 + time_tol):
+            regressions.append(f"{label}: fit time {old['fit_time_s']}s -> {res['fit_time_s']}s")
+        if 'mae' in res and 'mae' in old and res['mae'] > old['mae'] * (1 + error_tol):
+            regressions.append(f"{label}: MAE {old['mae']} -> {res['mae']}")
+    return regressions
+
+
+def _parse_order(text):
+    return tuple(int(x) for x in text.split(','))
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the ARIMA forecasting pipeline")
+    parser.add_argument('--orders', nargs='+', type=_parse_order,
+                        default=DEFAULT_ORDERS, help="ARIMA orders as p,d,q (e.g. 2,1,2)")
+    parser.add_argument('--horizons', nargs='+', type=int, default=DEFAULT_HORIZONS,
+                        help="Forecast horizons in resampled steps")
+    parser.add_argument('--fields', nargs='+', default=SENSOR_FIELDS, choices=SENSOR_FIELDS)
+    parser.add_argument('--hours', type=float, default=DEFAULT_HOURS, help="Length of synthetic history")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help="Timed fits per case; the fastest one is reported and compared")
+    parser.add_argument('--output', default='forecast_benchmark.json', help="Where to write the JSON report")
+    parser.add_argument('--baseline', help="Previous JSON report to check for regressions")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.fields, args.orders, args.horizons, args.hours, args.seed, args.repeats)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print("  " + line)
+            exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,84 @@
-
 # Import required libraries
-from influxdb import InfluxDBClient  # For connecting to InfluxDB
+import os  # For locating the shared storage package
+import sys  # For importing the shared storage package
 import pandas as pd  # For data manipulation
 from statsmodels.tsa.arima.model import ARIMA  # For time series forecasting
 from sklearn.metrics import mean_squared_error, mean_absolute_error  # For evaluation
-import matplotlib.pyplot as plt  # For plotting results
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Repository root
+from storage import open_storage, now_ns  # Shared InfluxDB / embedded time-series storage
 
 
 # === Config ===
 SENSOR_FIELDS = ['temperature', 'humidity', 'light']  # Sensor fields to forecast
-DB_HOST = 'localhost'  # InfluxDB host
-DB_PORT = 8086        # InfluxDB port
-DB_NAME = 'smartart'  # InfluxDB database name
+# Storage backend and InfluxDB location come from SMARTART_STORAGE / INFLUX_* (see storage/__init__.py)
+
+RESAMPLE_FREQ = '5S'  # Resampling interval used before fitting ARIMA
+DEFAULT_ORDER = (2, 1, 2)  # Default ARIMA (p, d, q) order
+MIN_POINTS = 10  # Minimum data points required for ARIMA
+TRAIN_RATIO = 0.8  # 80% for training, 20% for testing
+
+
+# === Read from Storage ===
+def load_sensor_dataframe(hours=6, storage=None):
+    # Query the last `hours` of sensor data and return it as a time-indexed DataFrame (or None)
+    storage = storage or open_storage()  # Connect to the configured time-series store
+    start = now_ns() - int(hours * 3600 * 1_000_000_000)
+    print(f"Querying {SENSOR_FIELDS} from all_sensor_data over the last {hours}h")
+    points = storage.query('all_sensor_data', fields=SENSOR_FIELDS, start=start)  # Query recent data
+    print(f"Retrieved {len(points)} points from storage.")
+    print("Sample points:", points[:8])  # Print first points for debugging
+    df = pd.DataFrame(points)  # Convert to DataFrame
+
+    # Check if DataFrame is empty
+    if df.empty:
+        print("No data returned from storage. DataFrame is empty.")
+        return None
+
+    # Print columns for debugging
+    print("DataFrame columns:", df.columns.tolist())
+
+    # Check for 'time' column
+    if 'time' not in df.columns:
+        print("Error: 'time' column not found in data. Columns returned:", df.columns.tolist())
+        return None
+
+    df['time'] = pd.to_datetime(df['time'])  # Convert time column to datetime
+    df.set_index('time', inplace=True)  # Set time as index
+    return df.dropna()  # Drop rows with missing values
 
-# === Read from InfluxDB ===
-client = InfluxDBClient(host=DB_HOST, port=DB_PORT, database=DB_NAME)  # Connect to InfluxDB
-field_str = ', '.join(['"{}"'.format(f) for f in SENSOR_FIELDS])  # Build field string for query
-query = f'SELECT {field_str} FROM "all_sensor_data" WHERE time > now() - 6h'  # Query last 6 hours of data 
-print("InfluxDB Query:", query)
-result = client.query(query)  # Execute query
-points = list(result.get_points())  # Get results as list of dicts
-print(f"Retrieved {len(points)} points from InfluxDB.")
-print("Sample points:", points[:8])  # Print first 2 points for debugging
-df = pd.DataFrame(points)  # Convert to DataFrame
 
-# Check if DataFrame is empty
-if df.empty:
-    print("No data returned from InfluxDB. DataFrame is empty.")
-    exit(1)
+# === Forecasting Helpers ===
+def prepare_series(series, freq=RESAMPLE_FREQ):
+    # Resample to a fixed interval and interpolate missing values
+    return series.resample(freq).mean().interpolate()
 
-# Print columns for debugging
-print("DataFrame columns:", df.columns.tolist())
 
-# Check for 'time' column
-if 'time' not in df.columns:
-    print("Error: 'time' column not found in data. Columns returned:", df.columns.tolist())
-    exit(1)
+def split_series(data, train_ratio=TRAIN_RATIO):
+    # Split a prepared series into train and test parts
+    split = int(train_ratio * len(data))
+    return data[:split], data[split:]
 
-df['time'] = pd.to_datetime(df['time'])  # Convert time column to datetime
-df.set_index('time', inplace=True)  # Set time as index
-df = df.dropna()  # Drop rows with missing values
+
+def fit_and_forecast(train, steps, order=DEFAULT_ORDER):
+    # Fit ARIMA on the training data and forecast `steps` points ahead
+    model = ARIMA(train, order=order)  # Create ARIMA model
+    model_fit = model.fit()  # Fit model to training data
+    return model_fit.forecast(steps=steps)  # Forecast for requested horizon
 
 
+def evaluate_forecast(test, forecast):
+    # Compute error metrics between actual and forecasted values
+    return {
+        'mae': float(mean_absolute_error(test, forecast)),  # Mean Absolute Error
+        'mse': float(mean_squared_error(test, forecast)),   # Mean Squared Error
+    }
+
 
 # === Forecasting Function ===
-def forecast_series(series, label, ax, order=(2, 1, 2)):
+def forecast_series(series, label, ax, order=DEFAULT_ORDER):
     # Forecast a single sensor field using ARIMA and plot on provided axis
     print(f"\n--- Forecasting {label} ---")
-    data = series.resample('5S').mean().interpolate()  # Resample to 5-second intervals and interpolate missing values
+    data = prepare_series(series)  # Resample to 5-second intervals and interpolate missing values
 
     print(f"{label} series length after resample/interpolate: {len(data)}")
     print(f"{label} series head:\n", data.head())
@@ -57,32 +88,26 @@ def forecast_series(series, label, ax, order=(2, 1, 2)):
         print(f"Skipping {label}: series is empty or all NaN after resampling/interpolation.")
         return
 
-    # Minimum data points required for ARIMA
-    MIN_POINTS = 10
     if len(data) < MIN_POINTS:
         print(f"Skipping {label}: not enough data points for ARIMA (found {len(data)}, need at least {MIN_POINTS}).")
         return
 
-    split = int(0.8 * len(data))  # 80% for training, 20% for testing
-    train, test = data[:split], data[split:]
+    train, test = split_series(data)
 
     # Check if train or test is empty
     if train.empty or test.empty:
         print(f"Skipping {label}: train or test split is empty.")
         return
 
-    model = ARIMA(train, order=order)  # Create ARIMA model
     try:
-        model_fit = model.fit()  # Fit model to training data
-        forecast = model_fit.forecast(steps=len(test))  # Forecast for test period
+        forecast = fit_and_forecast(train, len(test), order=order)  # Forecast for test period
     except Exception as e:
         print(f"Error fitting ARIMA for {label}: {e}")
         return
 
-    mae = mean_absolute_error(test, forecast)  # Mean Absolute Error
-    mse = mean_squared_error(test, forecast)   # Mean Squared Error
+    metrics = evaluate_forecast(test, forecast)
 
-    print(f"{label} - MAE: {mae:.2f}, MSE: {mse:.2f}")  # Print evaluation metrics
+    print(f"{label} - MAE: {metrics['mae']:.2f}, MSE: {metrics['mse']:.2f}")  # Print evaluation metrics
 
     # Plot actual vs. forecasted values on the provided axis
     ax.plot(test.index, test.values, label='Actual')
@@ -94,16 +119,28 @@ def forecast_series(series, label, ax, order=(2, 1, 2)):
     ax.ticklabel_format(style='plain', useOffset=False, axis='y')
 
 
-# === Forecast Each Field (all plots in one figure) ===
-fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
-plotted = 0
-for idx, field in enumerate(SENSOR_FIELDS):
-    if field in df.columns:
-        forecast_series(df[field], label=field, ax=axes[idx])  # Forecast for each sensor field
-        plotted += 1
-    else:
-        print(f"Warning: Field '{field}' not found in data.")  # Warn if field missing
+# === Main ===
+def main():
+    import matplotlib.pyplot as plt  # For plotting results (only needed for the interactive run)
+
+    df = load_sensor_dataframe()
+    if df is None:
+        exit(1)
+
+    # === Forecast Each Field (all plots in one figure) ===
+    fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    plotted = 0
+    for idx, field in enumerate(SENSOR_FIELDS):
+        if field in df.columns:
+            forecast_series(df[field], label=field, ax=axes[idx])  # Forecast for each sensor field
+            plotted += 1
+        else:
+            print(f"Warning: Field '{field}' not found in data.")  # Warn if field missing
+
+    if plotted:
+        plt.tight_layout()
+        plt.show()
+
 
-if plotted:
-    plt.tight_layout()
-    plt.show()
+if __name__ == "__main__":
+    main()
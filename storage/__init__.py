@@ -0,0 +1,40 @@
+# Shared time-series storage for all SmartArt components.
+# Two interchangeable backends expose the same small API:
+# - InfluxStorage: the InfluxDB server used by the full installation
+# - SQLiteStorage: an embedded SQLite (WAL) store for single-board installations,
+#   offline tests and benchmarks
+#
+#     storage = open_storage()
+#     storage.write_points([{"measurement": "all_sensor_data", "fields": {...}}])
+#     storage.query("sensor_data", start=..., end=..., order="desc", limit=1)
+#     storage.query("all_sensor_data", fields=["probe_id"], where={"probe_id": [17, 18]})
+#     storage.latest("sensor_data")
+
+# Import required libraries
+import os  # For backend selection through environment variables
+
+from .common import to_ns, now_ns, format_time  # noqa: F401  (re-exported helpers)
+
+# === Configuration (overridable through the environment) ===
+STORAGE_BACKEND = os.getenv("SMARTART_STORAGE", "influx")  # "influx" or "sqlite"
+INFLUX_HOST = os.getenv("INFLUX_HOST", "localhost")  # InfluxDB host
+INFLUX_PORT = int(os.getenv("INFLUX_PORT", "8086"))  # InfluxDB port
+INFLUX_DB = os.getenv("INFLUX_DB", "smartart")  # InfluxDB database name
+SQLITE_PATH = os.getenv("SMARTART_SQLITE_PATH",
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "smartart.db"))
+
+
+def open_storage(backend=None, **kwargs):
+    # Create the configured storage backend; keyword arguments override the environment
+    backend = backend or STORAGE_BACKEND
+    if backend == "influx":
+        from .influx_backend import InfluxStorage  # Imported lazily, influxdb is optional for sqlite
+        return InfluxStorage(
+            host=kwargs.get("host", INFLUX_HOST),
+            port=kwargs.get("port", INFLUX_PORT),
+            database=kwargs.get("database", INFLUX_DB)
+        )
+    if backend == "sqlite":
+        from .sqlite_backend import SQLiteStorage
+        return SQLiteStorage(kwargs.get("path", SQLITE_PATH))
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected 'influx' or 'sqlite')")
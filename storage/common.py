@@ -0,0 +1,50 @@
+# Timestamp helpers shared by the storage backends.
+# Times are handled internally as integer nanoseconds since the epoch and
+# returned to callers as RFC3339 strings, like InfluxDB does.
+
+# Import required libraries
+import re  # For parsing RFC3339 timestamps
+import time  # For the current time
+from datetime import datetime, timezone  # For timestamp conversion
+
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+def now_ns():
+    return time.time_ns()
+
+
+def to_ns(value):
+    # Convert ns ints, datetimes, pandas Timestamps or RFC3339 strings to epoch nanoseconds
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if hasattr(value, "value") and isinstance(value.value, int):
+        return value.value  # pandas.Timestamp
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp()) * 1_000_000_000 + value.microsecond * 1000
+    if isinstance(value, str):
+        text = value.replace("Z", "+00:00")
+        fraction = 0
+        m = _FRACTION_RE.search(text)
+        if m:
+            digits = m.group(1)
+            fraction = int(digits[:9].ljust(9, "0"))
+            text = text[:m.start()] + text[m.end():]
+        dt = datetime.fromisoformat(text)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp()) * 1_000_000_000 + fraction
+    raise TypeError(f"Unsupported time value: {value!r}")
+
+
+def format_time(ns):
+    # Format epoch nanoseconds as RFC3339 with trailing zeros trimmed (InfluxDB style)
+    seconds, fraction = divmod(ns, 1_000_000_000)
+    base = datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    if fraction:
+        base += "." + f"{fraction:09d}".rstrip("0")
+    return base + "Z"
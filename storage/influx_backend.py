@@ -0,0 +1,55 @@
+# Import required libraries
+from influxdb import InfluxDBClient  # For connecting to InfluxDB
+from .common import to_ns  # For time bounds
+
+
+def _literal(value):
+    # InfluxQL literal for an equality filter
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return repr(value)
+
+
+class InfluxStorage:
+    # Storage backend on an InfluxDB 1.x server
+    def __init__(self, host, port, database):
+        self.database = database
+        self.client = InfluxDBClient(host=host, port=port, database=database)  # Connect to InfluxDB
+
+    def create_database(self):
+        self.client.create_database(self.database)  # Create DB if not exists
+
+    def write_points(self, points):
+        # Write a list of {"measurement", "tags", "fields"[, "time"]} dicts in one call
+        self.client.write_points(points)
+
+    def query(self, measurement, fields=None, start=None, end=None, order="asc", limit=None, where=None):
+        # Return points of a measurement as dicts with a 'time' key, optionally bounded in time
+        # where: {field or tag: value or list of values} equality filter, evaluated by InfluxDB
+        field_str = ", ".join(f'"{f}"' for f in fields) if fields else "*"
+        query = f'SELECT {field_str} FROM "{measurement}"'
+        conditions = []
+        for field, value in (where or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            conditions.append("(" + " OR ".join(f'"{field}" = {_literal(v)}' for v in values) + ")")
+        if start is not None:
+            conditions.append(f"time >= {to_ns(start)}")
+        if end is not None:
+            conditions.append(f"time <= {to_ns(end)}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if order == "desc":
+            query += " ORDER BY time DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return list(self.client.query(query).get_points())
+
+    def latest(self, measurement):
+        # Most recent point of a measurement, or None
+        points = self.query(measurement, order="desc", limit=1)
+        return points[0] if points else None
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,81 @@
+# Import required libraries
+import json  # For storing tags and fields
+import sqlite3  # Embedded database
+import threading  # For sharing one connection between threads
+from .common import to_ns, now_ns, format_time  # For timestamps
+
+
+class SQLiteStorage:
+    # Embedded storage backend: one SQLite file in WAL mode, indexed on (measurement, time)
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers do not block the writer
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+        self.create_database()
+
+    def create_database(self):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS points ("
+                " measurement TEXT NOT NULL,"
+                " time INTEGER NOT NULL,"  # Nanoseconds since epoch
+                " tags TEXT NOT NULL,"
+                " fields TEXT NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_points_time ON points (measurement, time)")
+
+    def write_points(self, points):
+        # Write a list of {"measurement", "tags", "fields"[, "time"]} dicts in one transaction
+        default_time = now_ns()
+        rows = []
+        for i, p in enumerate(points):
+            t = to_ns(p["time"]) if p.get("time") is not None else default_time + i  # Keep batch order
+            rows.append((p["measurement"], t, json.dumps(p.get("tags") or {}), json.dumps(p.get("fields") or {})))
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT INTO points (measurement, time, tags, fields) VALUES (?, ?, ?, ?)", rows)
+
+    def query(self, measurement, fields=None, start=None, end=None, order="asc", limit=None, where=None):
+        # Return points of a measurement as dicts with a 'time' key, optionally bounded in time
+        # where: {field or tag: value or list of values} equality filter, evaluated inside SQLite
+        # (fields and tags are both looked up, like InfluxDB does for where and fields)
+        sql = "SELECT time, tags, fields FROM points WHERE measurement = ?"
+        args = [measurement]
+        for field, value in (where or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            sql += f" AND COALESCE(json_extract(fields, ?), json_extract(tags, ?)) IN ({', '.join('?' * len(values))})"
+            args.extend([f'$."{field}"'] * 2)
+            args.extend(values)
+        if start is not None:
+            sql += " AND time >= ?"
+            args.append(to_ns(start))
+        if end is not None:
+            sql += " AND time <= ?"
+            args.append(to_ns(end))
+        sql += " ORDER BY time DESC" if order == "desc" else " ORDER BY time ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        result = []
+        for t, tags, values in rows:
+            values = json.loads(values)
+            if fields:
+                tags = json.loads(tags)
+                point = {"time": format_time(t)}
+                point.update({f: values.get(f, tags.get(f)) for f in fields})  # Missing ones are None, like InfluxDB
+            else:
+                point = {"time": format_time(t), **values, **json.loads(tags)}
+            result.append(point)
+        return result
+
+    def latest(self, measurement):
+        # Most recent point of a measurement, or None
+        points = self.query(measurement, order="desc", limit=1)
+        return points[0] if points else None
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,65 @@
+# Local persistent buffer for ratings collected by the Telegram bot.
+# Ratings are stored in SQLite until the rating API acknowledges them, so an
+# API outage or a burst of raters never loses data. The primary key on
+# (user_id, visual_time) deduplicates repeated votes: the latest one wins.
+
+# Import required libraries
+import sqlite3  # For the local persistent queue
+import threading  # For guarding the shared connection
+import time  # For queue timestamps
+
+
+class RatingBuffer:
+    def __init__(self, path):
+        # Open (or create) the SQLite queue; WAL keeps inserts cheap while a flush reads
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_ratings ("
+            " user_id TEXT NOT NULL,"
+            " visual_time TEXT NOT NULL,"
+            " rating INTEGER NOT NULL,"
+            " queued_at REAL NOT NULL,"
+            " PRIMARY KEY (user_id, visual_time))"
+        )
+        # peek() reads the oldest entries first; keep that cheap when a backlog builds up during an outage
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pending_ratings_queued_at ON pending_ratings (queued_at)")
+        self.lock = threading.Lock()
+
+    def add(self, user_id, rating, visual_time):
+        # Queue a rating, replacing any unsent rating by the same user for the same visual
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pending_ratings (user_id, visual_time, rating, queued_at)"
+                " VALUES (?, ?, ?, ?)",
+                (str(user_id), str(visual_time), int(rating), time.time())
+            )
+
+    def peek(self, limit):
+        # Return up to `limit` of the oldest queued ratings without removing them
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT user_id, visual_time, rating, queued_at FROM pending_ratings"
+                " ORDER BY queued_at LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"user_id": u, "visual_time": vt, "rating": r, "queued_at": q}
+            for u, vt, r, q in rows
+        ]
+
+    def remove(self, entries):
+        # Drop acknowledged ratings; matching queued_at keeps a newer vote queued during the flush
+        with self.lock:
+            self.conn.executemany(
+                "DELETE FROM pending_ratings WHERE user_id = ? AND visual_time = ? AND queued_at = ?",
+                [(e["user_id"], e["visual_time"], e["queued_at"]) for e in entries]
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending_ratings").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
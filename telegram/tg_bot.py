@@ -1,11 +1,16 @@
 # Import required libraries
 import os  # For environment variables
-import requests  # For HTTP requests to the rating API
+import time  # For caching the latest visual and the flush backoff
+import asyncio  # For async handlers and background tasks
+import httpx  # Async HTTP client for the rating API (pooled connections)
+from rating_buffer import RatingBuffer  # Local persistent queue for unsent ratings
+from thumbnail_cache import ThumbnailCache  # Rendered visual lookup + Telegram file_id cache
 from dotenv import load_dotenv  # For loading environment variables from .env file
 import logging  # For logging bot activity
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update  # Telegram UI elements
+from telegram.error import TelegramError  # For falling back to text when a photo cannot be sent
 from telegram.ext import (
-    Updater, CommandHandler, CallbackQueryHandler, MessageHandler, Filters  # Telegram bot framework
+    Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters  # Telegram bot framework
 )
 
 
@@ -18,6 +23,17 @@ TOKEN = os.getenv("BOT_TOKEN")
 # === API CONFIG ===
 # Get the rating API endpoint from environment (default to localhost)
 VISUAL_API = os.getenv("VISUAL_API_URL", "http://localhost:5050")
+HTTP_TIMEOUT = float(os.getenv("VISUAL_API_TIMEOUT", "3"))  # Per-request timeout in seconds
+HTTP_MAX_CONNECTIONS = int(os.getenv("VISUAL_API_MAX_CONNECTIONS", "20"))  # Pool size towards the rating API
+CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", "256"))  # Updates processed in parallel
+RATING_BUFFER_PATH = os.getenv("RATING_BUFFER_PATH", "pending_ratings.db")  # SQLite file for queued ratings
+FLUSH_BATCH_SIZE = int(os.getenv("RATING_FLUSH_BATCH", "100"))  # Ratings sent per API call
+FLUSH_INTERVAL = 2.0  # Seconds between flushes when the queue is small
+FLUSH_BACKOFF_MAX = 60.0  # Upper bound for the retry backoff while the API is down
+VISUAL_CACHE_TTL = 1.0  # Seconds a fetched latest visual is reused across users
+# Directory where the renderer exports one thumbnail per visual
+THUMBNAIL_DIR = os.getenv("SMARTART_THUMBNAIL_DIR",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "thumbnails"))
 
 
 # Set up logging for info and error messages
@@ -27,53 +43,149 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# === Data Helpers ===
+
+# === Shared State ===
+http_client = None  # Shared httpx.AsyncClient, created in post_init
+rating_buffer = None  # RatingBuffer, created in post_init
+flush_wakeup = None  # Set when a full batch is waiting, to flush without waiting for the interval
+flush_task = None  # Background task draining the buffer
+pending_ratings = 0  # In-memory estimate of queued ratings, so clicks never COUNT(*) the buffer
+backoff_until = 0.0  # time.monotonic() before which the API is considered down and wakeups are ignored
+_visual_cache = {"time": 0.0, "value": None}  # Latest visual and when it was fetched
+_visual_lock = None  # Ensures only one fetch is in flight when the cache expires
+thumbnails = ThumbnailCache(THUMBNAIL_DIR)  # Thumbnail paths and their uploaded file_ids
+
 
 # === Data Helpers ===
-def fetch_latest_visual():
+async def fetch_latest_visual():
     # Fetch the latest visual (sensor entry with motion == 1) from the rating API
+    now = time.monotonic()
+    if now - _visual_cache["time"] < VISUAL_CACHE_TTL:
+        return _visual_cache["value"]  # Serve burst of /rate calls from the cache
+    async with _visual_lock:
+        if time.monotonic() - _visual_cache["time"] < VISUAL_CACHE_TTL:
+            return _visual_cache["value"]  # Another handler refreshed it while we waited
+        try:
+            resp = await http_client.get(f"{VISUAL_API}/latest_visual")  # GET request to API
+            if resp.status_code == 200:
+                visual = resp.json()  # Sensor data dict
+            else:
+                logger.warning(f"No visual found: {resp.text}")  # Log warning if not found
+                visual = None
+        except Exception as e:
+            logger.error(f"Error fetching latest visual: {e}")  # Log error if request fails
+            return None  # Do not cache transport errors
+        _visual_cache["time"] = time.monotonic()
+        _visual_cache["value"] = visual
+        return visual
+
+
+async def queue_rating(user_id, rating, visual_time):
+    # Persist the rating locally; the flusher delivers it to the API later
+    global pending_ratings
+    await asyncio.to_thread(rating_buffer.add, user_id, rating, visual_time)  # Keep SQLite off the event loop
+    pending_ratings += 1  # Over-counts replaced votes; resynced by the flusher
+    if pending_ratings >= FLUSH_BATCH_SIZE and time.monotonic() >= backoff_until:
+        flush_wakeup.set()  # A full batch is ready, do not wait for the interval (unless backing off)
+
+
+async def send_rating_batch(batch):
+    # POST a batch of ratings to the rating API, returns True if it was accepted
+    payload = {"ratings": [
+        {"user_id": e["user_id"], "rating": e["rating"], "visual_time": e["visual_time"],
+         "queued_at": e["queued_at"]}  # Rating time, not flush time
+        for e in batch
+    ]}
     try:
-        resp = requests.get(f"{VISUAL_API}/latest_visual", timeout=3)  # GET request to API
-        if resp.status_code == 200:
-            return resp.json()  # Return sensor data dict
-        else:
-            logger.warning(f"No visual found: {resp.text}")  # Log warning if not found
-            return None
+        resp = await http_client.post(f"{VISUAL_API}/rate_visuals", json=payload)  # POST batch to API
     except Exception as e:
-        logger.error(f"Error fetching latest visual: {e}")  # Log error if request fails
-        return None
+        logger.warning(f"Error flushing {len(batch)} ratings: {e}")  # Log error if request fails
+        return False
+    if resp.status_code == 200:
+        logger.info(f"Flushed {len(batch)} ratings to the rating API")  # Log success
+        return True
+    logger.warning(f"Rating API rejected batch ({resp.status_code}): {resp.text}")  # Log failure
+    return False
 
 
-def save_rating(user_id, rating, visual_time):
-    # Send a rating for a visual to the rating API
-    payload = {
-        "user_id": user_id,  # Telegram user ID
-        "rating": rating,    # Rating value (0-5)
-        "visual_time": visual_time  # Timestamp of the visual being rated
-    }
-    try:
-        resp = requests.post(f"{VISUAL_API}/rate_visual", json=payload, timeout=3)  # POST request to API
-        if resp.status_code == 200:
-            logger.info(f"Saved rating {rating} from user {user_id} for visual_time: {visual_time}")  # Log success
+async def flush_ratings():
+    # Drain the local buffer in batches, backing off exponentially while the API is unavailable
+    global pending_ratings, backoff_until
+    backoff = FLUSH_INTERVAL
+    while True:
+        try:
+            batch = await asyncio.to_thread(rating_buffer.peek, FLUSH_BATCH_SIZE)
+            sent = bool(batch) and await send_rating_batch(batch)
+            if sent:
+                await asyncio.to_thread(rating_buffer.remove, batch)
+                pending_ratings = await asyncio.to_thread(len, rating_buffer)  # Resync once per flush, not per click
+            failed = bool(batch) and not sent
+        except Exception as e:
+            # A buffer error must not end the task: ratings would be accepted but never sent
+            logger.error(f"Rating flush failed: {e}")
+            batch, sent, failed = [], False, True  # Treat like a failed flush, so the backoff applies
+        if sent:
+            backoff = FLUSH_INTERVAL
+            backoff_until = 0.0
+            if len(batch) == FLUSH_BATCH_SIZE:
+                continue  # More may be waiting, keep draining
+            delay = FLUSH_INTERVAL
+        elif failed:
+            delay = backoff
+            backoff = min(FLUSH_BACKOFF_MAX, backoff * 2)
+            backoff_until = time.monotonic() + delay  # Clicks must not wake us before the retry is due
         else:
-            logger.error(f"Failed to save rating: {resp.text}")  # Log failure
-    except Exception as e:
-        logger.error(f"Error saving rating: {e}")  # Log error if request fails
+            pending_ratings = 0
+            delay = FLUSH_INTERVAL
+        flush_wakeup.clear()
+        try:
+            await asyncio.wait_for(flush_wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
 
-# === Handlers ===
+
+async def send_rating_prompt(message, visual_time, text, reply_markup):
+    # Reply with the visual's thumbnail when available, reusing Telegram's file_id after the first upload
+    path = thumbnails.find(visual_time)
+    if path is None:
+        await message.reply_text(text, reply_markup=reply_markup)  # No thumbnail, fall back to text
+        return
+    file_id = thumbnails.get(path)
+    if file_id is None:
+        async with thumbnails.lock(path):
+            file_id = thumbnails.get(path)  # Another handler may have uploaded it while we waited
+            if file_id is None:
+                try:
+                    with open(path, "rb") as f:
+                        sent = await message.reply_photo(photo=f, caption=text, reply_markup=reply_markup)
+                    thumbnails.put(path, sent.photo[-1].file_id)  # Largest size Telegram generated
+                    return
+                except OSError as e:
+                    logger.warning(f"Could not read thumbnail {path}: {e}")  # Pruned meanwhile
+                except TelegramError as e:
+                    logger.warning(f"Could not upload thumbnail {path}: {e}")  # Timeout, network, bad request
+        if file_id is None:
+            thumbnails.discard_lock(path)  # Nothing cached for this path, do not keep its lock around
+            await message.reply_text(text, reply_markup=reply_markup)  # Fall back to text
+            return
+    try:
+        await message.reply_photo(photo=file_id, caption=text, reply_markup=reply_markup)
+    except TelegramError as e:
+        logger.warning(f"Could not send cached thumbnail {path}: {e}")
+        await message.reply_text(text, reply_markup=reply_markup)  # Fall back to text
 
 
 # === Handlers ===
-def start(update, context):
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handler for /start command. Greets the user.
-    update.message.reply_text("Welcome to SmartArt! Tap /rate to rate the current visual.")  # Send welcome message
+    await update.message.reply_text("Welcome to SmartArt! Tap /rate to rate the current visual.")  # Send welcome message
 
 
-def rate_menu(update, context):
+async def rate_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handler for /rate command. Shows the rating menu for the current visual.
-    visual = fetch_latest_visual()  # Get latest visual from API
+    visual = await fetch_latest_visual()  # Get latest visual from API
     if not visual:
-        update.message.reply_text("No visual available for rating right now.")  # Inform user if no visual
+        await update.message.reply_text("No visual available for rating right now.")  # Inform user if no visual
         return
     # Store visual_time in user_data for later use (for linking rating)
     context.user_data['visual_time'] = visual.get('time')  # Save timestamp
@@ -81,27 +193,72 @@ def rate_menu(update, context):
     keyboard = [
         [InlineKeyboardButton(f"{i} ⭐", callback_data=f"rate_{i}") for i in range(6)]  # 0-5 stars
     ]
-    update.message.reply_text("Please rate the current visual:", reply_markup=InlineKeyboardMarkup(keyboard))  # Show rating menu
+    await send_rating_prompt(update.message, visual.get('time'), "Please rate the current visual:",
+                             InlineKeyboardMarkup(keyboard))  # Show rating menu with the visual's thumbnail
 
 
-def button_handler(update: Update, context):
+async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handler for rating button presses. Saves the rating and links it to the visual.
     query = update.callback_query  # Get callback query
-    query.answer()  # Acknowledge button press
+    await query.answer()  # Acknowledge button press
 
     if query.data.startswith("rate_"):
         rating = int(query.data.split("_")[1])  # Extract rating value from callback data
         visual_time = context.user_data.get('visual_time')  # Get stored visual timestamp
         if not visual_time:
-            query.edit_message_text(text="❌ Could not link rating to visual.")  # Error if missing
+            await edit_prompt(query, "❌ Could not link rating to visual.")  # Error if missing
             return
-        save_rating(query.from_user.id, rating, visual_time)  # Save rating to API
-        query.edit_message_text(text=f"✅ Thanks for rating: {rating} ⭐")  # Confirm to user
+        await queue_rating(query.from_user.id, rating, visual_time)  # Buffer rating locally, flushed to the API in batches
+        await edit_prompt(query, f"✅ Thanks for rating: {rating} ⭐")  # Confirm to user
+
+
+async def edit_prompt(query, text):
+    # Replace the prompt text; photo prompts carry it in the caption
+    if query.message and query.message.photo:
+        await query.edit_message_caption(caption=text)
+    else:
+        await query.edit_message_text(text=text)
 
 
-def unknown(update, context):
+async def unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handler for unknown commands.
-    update.message.reply_text("Unknown command. Try /rate")  # Suggest /rate command
+    await update.message.reply_text("Unknown command. Try /rate")  # Suggest /rate command
+
+
+# === Lifecycle ===
+async def post_init(application):
+    # Create the shared HTTP client, rating buffer and flusher inside the bot's event loop
+    global http_client, rating_buffer, flush_wakeup, flush_task, _visual_lock, pending_ratings
+    http_client = httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_CONNECTIONS)
+    )
+    _visual_lock = asyncio.Lock()
+    rating_buffer = RatingBuffer(RATING_BUFFER_PATH)
+    pending_ratings = len(rating_buffer)
+    if pending_ratings:
+        logger.info(f"{pending_ratings} ratings left over from a previous run will be flushed")
+    flush_wakeup = asyncio.Event()
+    flush_task = asyncio.create_task(flush_ratings())
+
+
+async def post_shutdown(application):
+    # Stop the flusher, try one last flush, then close the HTTP pool and buffer
+    if flush_task is not None:
+        flush_task.cancel()
+        await asyncio.gather(flush_task, return_exceptions=True)
+    if rating_buffer is not None:
+        batch = rating_buffer.peek(FLUSH_BATCH_SIZE)
+        if batch and await send_rating_batch(batch):
+            rating_buffer.remove(batch)
+        remaining = len(rating_buffer)
+        if remaining:
+            logger.info(f"{remaining} ratings kept in {RATING_BUFFER_PATH} for the next run")
+        rating_buffer.close()
+    if http_client is not None:
+        await http_client.aclose()
+
 
 # === Main ===
 
@@ -111,18 +268,23 @@ def main():
         print("BOT_TOKEN not found in environment!")  # Error if token missing
         return
 
-    updater = Updater(TOKEN, use_context=True)  # Create bot updater
-    dp = updater.dispatcher  # Dispatcher for handlers
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .concurrent_updates(CONCURRENT_UPDATES)  # Handle many users in parallel
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Register command and callback handlers
-    dp.add_handler(CommandHandler("start", start))  # /start command
-    dp.add_handler(CommandHandler("rate", rate_menu))  # /rate command
-    dp.add_handler(CallbackQueryHandler(button_handler))  # Rating button handler
-    dp.add_handler(MessageHandler(Filters.command, unknown))  # Unknown command handler
+    application.add_handler(CommandHandler("start", start))  # /start command
+    application.add_handler(CommandHandler("rate", rate_menu))  # /rate command
+    application.add_handler(CallbackQueryHandler(button_handler))  # Rating button handler
+    application.add_handler(MessageHandler(filters.COMMAND, unknown))  # Unknown command handler
 
     logger.info("Bot started. Waiting for messages...")  # Log bot start
-    updater.start_polling()  # Start polling for messages
-    updater.idle()  # Wait for bot to finish
+    application.run_polling()  # Start polling for messages until interrupted
 
 if __name__ == "__main__":
     main()  # Run main if script is executed
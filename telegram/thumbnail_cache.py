@@ -0,0 +1,74 @@
+# Thumbnail lookup and Telegram file_id cache for the /rate prompt.
+# The renderer exports one JPEG per visual named visual_<epoch_ms>.jpg; a visual
+# is matched to the thumbnail rendered closest to its InfluxDB timestamp.
+# After the first upload Telegram returns a file_id, which is reused for every
+# later /rate of the same visual instead of uploading the file again.
+
+# Import required libraries
+import os  # For listing exported thumbnails
+import re  # For parsing InfluxDB timestamps
+import asyncio  # For per-thumbnail upload locks
+from collections import OrderedDict  # For a bounded LRU of Telegram file_ids
+from datetime import datetime, timezone  # For converting visual timestamps
+
+_FILENAME_RE = re.compile(r"^visual_(\d+)\.jpg$")
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+def visual_time_to_ms(visual_time):
+    # Convert an RFC3339 timestamp from InfluxDB (up to ns precision) to epoch milliseconds
+    text = visual_time.replace("Z", "+00:00")
+    text = _FRACTION_RE.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text, count=1)
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+class ThumbnailCache:
+    def __init__(self, directory, window_ms=5000, max_entries=256):
+        self.directory = directory  # Where the renderer exports thumbnails
+        self.window_ms = window_ms  # Max distance between visual time and render time
+        self.max_entries = max_entries  # Bound on cached file_ids
+        self.file_ids = OrderedDict()  # Thumbnail path -> Telegram file_id
+        self.locks = {}  # Thumbnail path -> asyncio.Lock, so concurrent /rate calls upload once
+
+    def find(self, visual_time):
+        # Return the thumbnail path rendered closest to visual_time, or None
+        try:
+            target = visual_time_to_ms(visual_time)
+            names = os.listdir(self.directory)
+        except (ValueError, TypeError, OSError):
+            return None
+        best, best_dist = None, self.window_ms + 1
+        for name in names:
+            m = _FILENAME_RE.match(name)
+            if not m:
+                continue
+            dist = abs(int(m.group(1)) - target)
+            if dist < best_dist:
+                best, best_dist = name, dist
+        return os.path.join(self.directory, best) if best else None
+
+    def get(self, path):
+        # Cached file_id for a thumbnail, if it was uploaded before
+        file_id = self.file_ids.get(path)
+        if file_id is not None:
+            self.file_ids.move_to_end(path)
+        return file_id
+
+    def put(self, path, file_id):
+        # Remember the file_id Telegram assigned to an uploaded thumbnail
+        self.file_ids[path] = file_id
+        self.file_ids.move_to_end(path)
+        while len(self.file_ids) > self.max_entries:
+            old, _ = self.file_ids.popitem(last=False)
+            self.locks.pop(old, None)
+
+    def lock(self, path):
+        # Lock serializing the first upload of a thumbnail
+        return self.locks.setdefault(path, asyncio.Lock())
+
+    def discard_lock(self, path):
+        # Forget the upload lock of a thumbnail whose upload failed (it has no file_id to evict it later)
+        self.locks.pop(path, None)